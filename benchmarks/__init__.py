@@ -0,0 +1,5 @@
+"""
+Benchmarks over synthetic decks. Run from the repository root, e.g.
+
+    python -m benchmarks.card_memory --cards 100000
+"""
@@ -0,0 +1,47 @@
+"""
+Deck build time, serial vs the process pool in flashcards.build.
+
+    python -m benchmarks.build_time --cards 1000 10000 100000 --workers 1 2 4
+
+Every worker count runs the parallel path, even below
+build.PARALLEL_MIN_CARDS, so the pool start-up cost on small decks shows.
+Each parallel build is checked against the serial one, card for card.
+"""
+
+import argparse
+import os
+import time
+
+from benchmarks.synthetic import synthetic_cards
+from flashcards import build
+from flashcards.cards import card_json
+from flashcards.lexicon import load_lexicons
+
+
+def timed_build(cards, lexicons, workers):
+    start = time.perf_counter()
+    built = build.build_deck(cards, lexicons, workers=workers)
+    return time.perf_counter() - start, built
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time deck builds on synthetic decks.")
+    parser.add_argument("--cards", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}))
+    args = parser.parse_args(argv)
+    lexicons = load_lexicons()
+    build.PARALLEL_MIN_CARDS = 0
+    print("cores: {}".format(os.cpu_count()))
+    print("{:>8} {:>8} {:>9} {:>8} {:>9}".format("cards", "workers", "seconds", "speedup", "same"))
+    for count in args.cards:
+        cards = synthetic_cards(count)
+        serial_s, serial = timed_build(cards, lexicons, 1)
+        expected = [card_json(card) for card in serial]
+        for workers in args.workers:
+            seconds, built = (serial_s, serial) if workers == 1 else timed_build(cards, lexicons, workers)
+            same = [card_json(card) for card in built] == expected
+            print("{:>8} {:>8} {:>9.2f} {:>8.2f} {:>9}".format(count, workers, seconds, serial_s / seconds, str(same)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Memory held by a built deck as dicts vs as compact cards (flashcards.cards).
+
+    python -m benchmarks.card_memory --cards 100000
+
+Both decks are parsed from the same synthetic deck-file text and compiled
+the same way; only the in-memory form differs. Memory is what tracemalloc
+sees still allocated once the deck is built, and encode is the time to
+turn the whole deck into payload JSON.
+"""
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+from benchmarks.synthetic import synthetic_json
+from flashcards.build import build_card, compile_card
+from flashcards.lexicon import load_lexicons
+from flashcards.payload import encode_json
+from flashcards.registry import deep_sizeof
+
+
+def load_deck(text, lexicons, compile_one):
+    return [compile_one(card, lexicons) for card in json.loads(text)["flashcards"]]
+
+
+def measure(text, lexicons, compile_one):
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    cards = load_deck(text, lexicons, compile_one)
+    load_s = time.perf_counter() - start
+    gc.collect()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    start = time.perf_counter()
+    encode_json(cards)
+    encode_s = time.perf_counter() - start
+    return {
+        "cards": len(cards),
+        "held_mb": held / 1e6,
+        "peak_mb": peak / 1e6,
+        "sizeof_mb": deep_sizeof(cards) / 1e6,
+        "load_s": load_s,
+        "encode_s": encode_s,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare dict and compact card memory on a synthetic deck.")
+    parser.add_argument("--cards", type=int, nargs="+", default=[100000])
+    args = parser.parse_args(argv)
+    lexicons = load_lexicons()
+    print("{:>8} {:<8} {:>9} {:>9} {:>10} {:>7} {:>9}".format(
+        "cards", "form", "held MB", "peak MB", "sizeof MB", "load s", "encode s"))
+    for count in args.cards:
+        text = synthetic_json(count)
+        for form, compile_one in (("dict", compile_card), ("compact", build_card)):
+            row = measure(text, lexicons, compile_one)
+            print("{:>8} {:<8} {:>9.1f} {:>9.1f} {:>10.1f} {:>7.2f} {:>9.2f}".format(
+                row["cards"], form, row["held_mb"], row["peak_mb"], row["sizeof_mb"],
+                row["load_s"], row["encode_s"]))
+
+
+if __name__ == "__main__":
+    main()
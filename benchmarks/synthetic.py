@@ -0,0 +1,33 @@
+"""
+Synthetic decks of any size, made by cycling the cards of a real deck.
+
+Each copy gets a numbered prompt (so it has its own id and strings) but
+keeps the type/category mix of the original deck.
+"""
+
+import json
+import os
+
+from flashcards.deck import assign_card_ids, read_deck_file
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_DECK = os.path.join(ROOT, "data.json")
+
+
+def synthetic_cards(count, sample=SAMPLE_DECK):
+    """`count` raw cards with ids, as a deck file would give them."""
+    base = read_deck_file(sample)
+    cards = []
+    for i in range(count):
+        card = dict(base[i % len(base)])
+        card.pop("id", None)
+        suffix = " ({})".format(i // len(base)) if i >= len(base) else ""
+        prompt = "question" if card.get("type") == "ielts_questions" else "chinese"
+        card[prompt] = card.get(prompt, "") + suffix
+        cards.append(card)
+    return assign_card_ids(cards)
+
+
+def synthetic_json(count, sample=SAMPLE_DECK):
+    """synthetic_cards() as deck-file text, for benchmarks that should include parsing."""
+    return json.dumps({"flashcards": synthetic_cards(count, sample)}, ensure_ascii=False)
@@ -0,0 +1 @@
+"""Deck loading and build helpers for the Streamlit flashcards app."""
@@ -0,0 +1,164 @@
+"""
+Deck build steps that run once in Python instead of on every reveal in the page.
+"""
+
+import logging
+import multiprocessing
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+
+from flashcards.build_cache import pipeline_key
+from flashcards.cards import compact_card
+from flashcards.lexicon import attach_card_lexicons, attach_verb_forms
+
+# Discourse markers that open a new paragraph in an IELTS answer, by type.
+# Same phrases the page used to split on with regexes at reveal time.
+PARAGRAPH_MARKERS = {
+    "conclusion": ["In conclusion,", "To conclude,", "To sum up,", "In short,", "In summary,"],
+    "point": ["Point 1:", "Point 2:", "Point 3:", "Point 4:", "Point 5:"],
+    "reason": ["Reason 1:", "Reason 2:", "Reason 3:", "Reason 4:"],
+    "ordinal": ["First,", "Second,", "Third,", "Fourth,", "Fifth,", "Finally,"],
+    "transition": ["As for", "Moreover,", "Furthermore,", "Additionally,", "Also,"],
+}
+
+_MARKER_TYPES = {
+    phrase.lower(): marker
+    for marker, phrases in PARAGRAPH_MARKERS.items()
+    for phrase in phrases
+}
+_MARKER_RE = re.compile(
+    r"(?:\s|^)(" + "|".join(re.escape(p) for p in sorted(_MARKER_TYPES, key=len, reverse=True)) + ")",
+    re.IGNORECASE,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def split_paragraphs(text):
+    """
+    Split an IELTS answer before each discourse marker.
+
+    Returns a list of {"marker": <type or None>, "start": i, "end": j} where
+    text[i:j] is the paragraph with surrounding whitespace trimmed. The first
+    paragraph has marker None unless the answer opens with a marker.
+    Offsets count UTF-16 code units so the page can slice with String.slice().
+    """
+    paragraphs = []
+    bounds = [(0, None)]
+    bounds += [(m.start(1), _MARKER_TYPES[m.group(1).lower()]) for m in _MARKER_RE.finditer(text)]
+    bounds.append((len(text), None))
+    for (start, marker), (end, _) in zip(bounds, bounds[1:]):
+        chunk = text[start:end]
+        stripped = chunk.strip()
+        if stripped:
+            start += len(chunk) - len(chunk.lstrip())
+            paragraphs.append({
+                "marker": marker,
+                "start": _utf16_len(text[:start]),
+                "end": _utf16_len(text[:start + len(stripped)]),
+            })
+    return paragraphs
+
+
+def _utf16_len(text):
+    return len(text.encode("utf-16-le")) // 2
+
+
+def compile_card(card, lexicons):
+    """
+    Compile one raw card into what the page renders: attach lexicon entries
+    and verb forms, and split IELTS answers into paragraphs.
+    """
+    card = attach_verb_forms(attach_card_lexicons(card, lexicons), lexicons)
+    if card.get("type") == "ielts_questions" and card.get("answer"):
+        card = dict(card, answerParagraphs=split_paragraphs(card["answer"]))
+    return card
+
+
+def build_card(card, lexicons):
+    """compile_card(), kept in memory as a compact card (see flashcards.cards)."""
+    return compact_card(compile_card(card, lexicons))
+
+
+def build_deck(cards, lexicons, reuse=None, workers=None, cache=None):
+    """
+    build_card() over a deck. `reuse(card)` may return an already built
+    version of an unchanged card (see DeckSnapshot.reusable), in which case
+    that card is not rebuilt. Cards not reused are looked up in `cache` (a
+    flashcards.build_cache.BuildCache), and only the misses are compiled and
+    then stored.
+
+    When at least PARALLEL_MIN_CARDS cards need compiling they are split
+    into chunks over a process pool of `workers` processes (default: one per
+    core; 1 forces a serial build). Results are merged back in deck order,
+    so the output does not depend on how the work was split.
+    """
+    built = [reuse(card) if reuse else None for card in cards]
+    pending = [i for i, card in enumerate(built) if card is None]
+    reused = len(cards) - len(pending)
+
+    cached = {}
+    if cache is not None and pending:
+        pipeline = pipeline_key(lexicons)
+        keys = {i: cache.key(cards[i], pipeline) for i in pending}
+        hits = cache.lookup(keys.values())
+        for i in pending:
+            if keys[i] in hits:
+                cached[i] = hits[keys[i]]
+        pending = [i for i in pending if i not in cached]
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(pending) >= PARALLEL_MIN_CARDS:
+        compiled = dict(zip(pending, _compile_parallel([cards[i] for i in pending], lexicons, workers)))
+    else:
+        compiled = {i: compile_card(cards[i], lexicons) for i in pending}
+    if cache is not None and compiled:
+        cache.store({keys[i]: card for i, card in compiled.items()}, pipeline)
+
+    # Compacting happens here rather than in the workers so strings are
+    # interned in this process.
+    for i, card in chain(cached.items(), compiled.items()):
+        built[i] = compact_card(card)
+    logger.info("Built %d cards: %d reused, %d from cache, %d compiled",
+                len(cards), reused, len(cached), len(compiled))
+    return built
+
+
+# --- Parallel compile ---------------------------------------------------------
+
+# Below this many cards, starting worker processes costs more than it saves.
+PARALLEL_MIN_CARDS = 5000
+# Chunks per worker: enough to even out slow chunks (IELTS-heavy ones).
+CHUNKS_PER_WORKER = 4
+
+_worker_lexicons = None
+
+
+def _start_method():
+    # Never fork: the build can start from the Streamlit server or the deck
+    # watcher's thread, and forking a threaded process can leave a child
+    # stuck on a lock another thread held. Workers get the lexicons through
+    # _init_worker, so nothing relies on fork's copy of memory.
+    return "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+def _init_worker(lexicons):
+    global _worker_lexicons
+    _worker_lexicons = lexicons
+
+
+def _compile_chunk(chunk):
+    return [compile_card(card, _worker_lexicons) for card in chunk]
+
+
+def _compile_parallel(cards, lexicons, workers):
+    size = max(1, -(-len(cards) // (workers * CHUNKS_PER_WORKER)))
+    chunks = [cards[i:i + size] for i in range(0, len(cards), size)]
+    context = multiprocessing.get_context(_start_method())
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                             initializer=_init_worker, initargs=(lexicons,)) as pool:
+        # map() yields in submission order whatever order the chunks finish in.
+        for compiled in pool.map(_compile_chunk, chunks):
+            yield from compiled
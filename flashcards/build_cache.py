@@ -0,0 +1,162 @@
+"""
+On-disk cache of compiled cards, so a rebuild only compiles new or edited cards.
+
+Entries live in a SQLite file (.build_cache/cards.sqlite by default). Each
+one is keyed by the SHA-1 of the raw card's canonical JSON together with the
+pipeline key, and holds what compile_card() produced: the IELTS paragraph
+offsets and the lexicon attachments. The pipeline key combines
+BUILD_VERSION and a digest of every lexicon. Bumping BUILD_VERSION or
+editing a lexicon therefore misses every card, and stale entries are never
+served.
+
+Entries are pruned whenever new ones are stored: those of any other
+pipeline key can never be looked up again and are deleted, and past
+MAX_ENTRIES the least recently used go. Each entry's `used_at` is bumped
+by lookup() (at most once every TOUCH_SECONDS, to keep lookups mostly
+read-only).
+
+Highlighted HTML is not rendered in Python. The page renders it and keeps
+it in IndexedDB per deck version, so it has no place in this cache.
+
+    python -m flashcards.build_cache data.json
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import time
+
+from flashcards.sources import SqlitePool
+
+# Bump when compile_card() output changes for the same input.
+BUILD_VERSION = 2
+
+DEFAULT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".build_cache", "cards.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS compiled (
+    key TEXT PRIMARY KEY,
+    card TEXT NOT NULL,
+    pipeline TEXT NOT NULL,
+    used_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS compiled_pipeline ON compiled (pipeline);
+CREATE INDEX IF NOT EXISTS compiled_used_at ON compiled (used_at);
+"""
+
+# Entries kept across all decks; several times the largest deck, so a
+# rebuild never evicts cards the same build still needs.
+MAX_ENTRIES = 500000
+TOUCH_SECONDS = 3600
+
+# SQLite's default limit on bound parameters is 999.
+_BATCH = 500
+
+
+def pipeline_key(lexicons):
+    """BUILD_VERSION plus a digest of each lexicon's entries."""
+    digest = hashlib.sha1(str(BUILD_VERSION).encode("utf-8"))
+    for name in sorted(lexicons):
+        digest.update(name.encode("utf-8"))
+        digest.update(json.dumps(lexicons[name].entries, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class BuildCache:
+
+    def __init__(self, path=DEFAULT_PATH, max_entries=MAX_ENTRIES):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.pool = SqlitePool.for_path(path)
+        with self.pool.connection() as conn:
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(compiled)")}
+            if columns and "used_at" not in columns:
+                # A cache from before pruning: its entries cannot be attributed
+                # to a pipeline, so start over.
+                conn.execute("DROP TABLE compiled")
+            conn.executescript(SCHEMA)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(card, pipeline):
+        encoded = json.dumps(card, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha1((pipeline + "\n" + encoded).encode("utf-8")).hexdigest()
+
+    def lookup(self, keys):
+        """{key: compiled card} for the `keys` that are cached; counts hits and misses."""
+        keys = list(keys)
+        found = {}
+        stale = []
+        now = int(time.time())
+        with self.pool.connection() as conn:
+            for i in range(0, len(keys), _BATCH):
+                batch = keys[i:i + _BATCH]
+                rows = conn.execute(
+                    "SELECT key, card, used_at FROM compiled WHERE key IN ({})".format(",".join("?" * len(batch))),
+                    batch)
+                for row in rows:
+                    found[row["key"]] = json.loads(row["card"])
+                    if now - row["used_at"] >= TOUCH_SECONDS:
+                        stale.append(row["key"])
+            if stale:
+                with conn:
+                    for i in range(0, len(stale), _BATCH):
+                        batch = stale[i:i + _BATCH]
+                        conn.execute("UPDATE compiled SET used_at = ? WHERE key IN ({})".format(
+                            ",".join("?" * len(batch))), [now] + batch)
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def store(self, entries, pipeline):
+        """Save {key: compiled card} made under `pipeline`, then prune()."""
+        now = int(time.time())
+        rows = [
+            (key, json.dumps(card, ensure_ascii=False, separators=(",", ":")), pipeline, now)
+            for key, card in entries.items()
+        ]
+        with self.pool.connection() as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO compiled (key, card, pipeline, used_at) VALUES (?, ?, ?, ?)", rows)
+        self.prune(pipeline)
+
+    def prune(self, pipeline):
+        """Delete entries of other pipelines, then the least recently used past max_entries."""
+        with self.pool.connection() as conn, conn:
+            removed = conn.execute("DELETE FROM compiled WHERE pipeline != ?", (pipeline,)).rowcount
+            excess = conn.execute("SELECT COUNT(*) FROM compiled").fetchone()[0] - self.max_entries
+            if excess > 0:
+                removed += conn.execute(
+                    "DELETE FROM compiled WHERE key IN (SELECT key FROM compiled ORDER BY used_at LIMIT ?)",
+                    (excess,)).rowcount
+        return removed
+
+    def __len__(self):
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM compiled").fetchone()[0]
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def main(argv=None):
+    from flashcards.build import build_deck
+    from flashcards.lexicon import load_lexicons
+    from flashcards.sources import open_deck_source
+
+    parser = argparse.ArgumentParser(description="Build a deck through the build cache and report hits/misses.")
+    parser.add_argument("deck", help="data.json, .jsonl or .sqlite deck")
+    parser.add_argument("--cache", default=DEFAULT_PATH, help="cache file (default: %(default)s)")
+    args = parser.parse_args(argv)
+    cache = BuildCache(args.cache)
+    cards = build_deck(open_deck_source(args.deck).cards(), load_lexicons(), cache=cache)
+    print("{} cards: {} cache hits, {} misses; {} entries cached".format(
+        len(cards), cache.hits, cache.misses, len(cache)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Compact in-memory cards.
+
+A built deck held as dicts repeats every key on every card and keeps its
+own copy of each `type`, `category` and `verbGroup` string. The classes
+here store one card per __slots__ object, with:
+
+  - enum-like strings (type, category, verbGroup, connectives, phrasal
+    verb terms) interned, so every card shares one copy of each;
+  - lists stored as tuples, and list items that are small records such as
+    {"chinese", "english"} stored as plain tuples in a fixed field order.
+
+The JSON the page needs is only rebuilt by to_json(), i.e. when a payload
+or revision hash is made. Card objects also answer card["key"] and
+card.get("key") with the JSON value, so code written against dict cards
+keeps working.
+
+There are three shapes: TextCard (sentence and vocabulary cards),
+PhrasalVerbCard and IeltsCard. compact_card() picks the class by "type"
+and leaves cards of any other type as they are.
+"""
+
+import sys
+
+_UNSET = object()
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Card:
+    """Base class: `id`, `type` and whatever keys the shape does not know (`extra`)."""
+
+    __slots__ = ("id", "type", "extra")
+
+    TYPES = ()
+    # JSON keys stored in slots, in output order after id and type.
+    FIELDS = ()
+    # Fields whose strings (or list items) are interned.
+    INTERNED = ("type",)
+    # List fields whose dict items are stored as tuples in this key order.
+    RECORDS = {}
+
+    @classmethod
+    def from_json(cls, data):
+        card = cls.__new__(cls)
+        card.extra = None
+        known = ("id", "type") + cls.FIELDS
+        for key, value in data.items():
+            if key in known:
+                setattr(card, key, cls._freeze(key, value))
+            else:
+                if card.extra is None:
+                    card.extra = {}
+                card.extra[key] = value
+        return card
+
+    @classmethod
+    def _freeze(cls, key, value):
+        interned = key in cls.INTERNED
+        if isinstance(value, list):
+            schema = cls.RECORDS.get(key)
+            items = []
+            for item in value:
+                if schema and isinstance(item, dict) and len(item) == len(schema) and all(k in item for k in schema):
+                    item = tuple(_intern(item[k]) if interned else item[k] for k in schema)
+                elif interned:
+                    item = _intern(item)
+                items.append(item)
+            return tuple(items)
+        return _intern(value) if interned else value
+
+    @classmethod
+    def _thaw(cls, key, value):
+        if not isinstance(value, tuple):
+            return value
+        schema = cls.RECORDS.get(key)
+        return [dict(zip(schema, item)) if schema and isinstance(item, tuple) else item for item in value]
+
+    def to_json(self):
+        """The card as the dict the page expects."""
+        data = {}
+        for key in ("id", "type") + self.FIELDS:
+            value = getattr(self, key, _UNSET)
+            if value is not _UNSET:
+                data[key] = self._thaw(key, value)
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def replace(self, **fields):
+        """A copy of the card with `fields` (JSON values) set."""
+        return self.from_json(dict(self.to_json(), **fields))
+
+    def __getitem__(self, key):
+        if key in self.__class__.FIELDS or key in ("id", "type"):
+            value = getattr(self, key, _UNSET)
+            if value is not _UNSET:
+                return self._thaw(key, value)
+        elif self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        return self.get(key, _UNSET) is not _UNSET
+
+    def __repr__(self):
+        return "{}(id={!r})".format(self.__class__.__name__, getattr(self, "id", None))
+
+
+class TextCard(Card):
+    """sentence and vocabulary cards: a Chinese prompt and its English (a string or a list of options)."""
+
+    __slots__ = ("category", "chinese", "english", "distractors", "difficulty", "usedIn")
+
+    TYPES = ("sentence", "vocabulary")
+    FIELDS = __slots__
+    INTERNED = ("type", "category")
+
+
+class PhrasalVerbCard(Card):
+    __slots__ = (
+        "verbGroup", "chinese", "english", "phrasalVerbs", "phrasalVerbForms", "distractors", "difficulty", "usedIn",
+    )
+
+    TYPES = ("phrasal_verbs",)
+    FIELDS = __slots__
+    INTERNED = ("type", "verbGroup", "phrasalVerbs")
+    RECORDS = {"phrasalVerbs": ("chinese", "english")}
+
+
+class IeltsCard(Card):
+    """An IELTS question and model answer, with what the build attached to it."""
+
+    __slots__ = (
+        "question", "answer", "logicalConnectives", "phrasalVerbs", "advancedVocab",
+        "phrasalVerbTranslations", "vocabSynonyms", "answerParagraphs", "difficulty",
+    )
+
+    TYPES = ("ielts_questions",)
+    FIELDS = __slots__
+    INTERNED = ("type", "logicalConnectives", "phrasalVerbs", "answerParagraphs")
+    RECORDS = {
+        "advancedVocab": ("word", "translation"),
+        "answerParagraphs": ("marker", "start", "end"),
+    }
+
+
+CARD_CLASSES = {card_type: cls for cls in (TextCard, PhrasalVerbCard, IeltsCard) for card_type in cls.TYPES}
+
+
+def compact_card(card):
+    """The compact form of a card dict; cards of unknown type (or already compact) are returned as they are."""
+    cls = CARD_CLASSES.get(card.get("type")) if isinstance(card, dict) else None
+    return cls.from_json(card) if cls else card
+
+
+def card_json(card):
+    """The JSON dict for a compact or dict card."""
+    return card.to_json() if isinstance(card, Card) else card
+
+
+def with_field(card, key, value):
+    """
+    `card` with `key` set to `value`: the same object if it already has that
+    value, else a copy. Deck-wide build steps use this so the deck snapshot
+    sees unchanged cards as unchanged.
+    """
+    if card.get(key) == value:
+        return card
+    return card.replace(**{key: value}) if isinstance(card, Card) else dict(card, **{key: value})
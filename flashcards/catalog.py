@@ -0,0 +1,81 @@
+"""
+Which decks this instance serves and who gets which one.
+
+Decks are the data.json/.jsonl/.sqlite files in decks/, plus any listed in
+decks/decks.json:
+
+    {
+      "default": "data",
+      "decks": {"data": {"path": "../data.json", "title": "Speaking Flashcards for Eiki"}},
+      "users": {"eiki": "data"}
+    }
+
+Paths are relative to the decks directory. A deck is picked by ?deck=<id>,
+else by ?user=<name> through "users", else the default.
+"""
+
+import json
+import os
+
+from flashcards.sources import SOURCES
+
+DEFAULT_TITLE = "Speaking Flashcards"
+
+
+class DeckCatalog:
+
+    def __init__(self, directory, fallback=None):
+        """
+        `fallback` is a deck file used as the default when the catalog lists
+        nothing (the old single data.json layout).
+        """
+        self.directory = directory
+        self.decks = {}
+        self.users = {}
+        self.default = None
+        self._discover()
+        self._read_catalog()
+        if fallback and not self.decks:
+            deck_id = os.path.splitext(os.path.basename(fallback))[0]
+            self.decks[deck_id] = {"path": fallback, "title": DEFAULT_TITLE}
+        if self.default not in self.decks:
+            self.default = next(iter(sorted(self.decks)), None)
+
+    def _discover(self):
+        if not os.path.isdir(self.directory):
+            return
+        for name in sorted(os.listdir(self.directory)):
+            deck_id, ext = os.path.splitext(name)
+            if ext.lower() in SOURCES and name != "decks.json":
+                self.decks[deck_id] = {
+                    "path": os.path.join(self.directory, name),
+                    "title": deck_id.replace("_", " ").replace("-", " ").title(),
+                }
+
+    def _read_catalog(self):
+        path = os.path.join(self.directory, "decks.json")
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for deck_id, entry in data.get("decks", {}).items():
+            deck = dict(self.decks.get(deck_id, {}), **entry)
+            deck["path"] = os.path.normpath(os.path.join(self.directory, deck["path"]))
+            deck.setdefault("title", DEFAULT_TITLE)
+            self.decks[deck_id] = deck
+        self.users = data.get("users", {})
+        self.default = data.get("default")
+
+    def __contains__(self, deck_id):
+        return deck_id in self.decks
+
+    def __getitem__(self, deck_id):
+        return self.decks[deck_id]
+
+    def resolve(self, deck=None, user=None):
+        """The deck id to serve for a ?deck= / ?user= pair, or None if there are no decks."""
+        if deck in self.decks:
+            return deck
+        if user in self.users and self.users[user] in self.decks:
+            return self.users[user]
+        return self.default
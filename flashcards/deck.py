@@ -0,0 +1,197 @@
+"""
+Card identity and JSON-lines deck files with random access by card id.
+
+A card id is a short hash of the card's type and prompt (`chinese`, or
+`question` for IELTS cards), so it survives reloads, reshuffles and edits to
+the answer side. Repeated prompts (the deck has several answers to the same
+IELTS question) get an ordinal suffix in file order: "3f2a9c01d4be",
+"3f2a9c01d4be-2", ...
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import re
+
+ID_LENGTH = 12
+
+
+def card_prompt(card):
+    """The side of the card the learner sees first."""
+    if card.get("type") == "ielts_questions":
+        return card.get("question") or ""
+    return card.get("chinese") or ""
+
+
+def card_key_hash(card):
+    key = "{}\x1f{}".format(card.get("type", ""), card_prompt(card))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:ID_LENGTH]
+
+
+def assign_card_ids(cards):
+    """Return copies of `cards` with an "id" field; existing ids are kept."""
+    seen = {}
+    assigned = []
+    for card in cards:
+        if card.get("id"):
+            assigned.append(card)
+            continue
+        base = card_key_hash(card)
+        seen[base] = seen.get(base, 0) + 1
+        card_id = base if seen[base] == 1 else "{}-{}".format(base, seen[base])
+        assigned.append(dict(card, id=card_id))
+    return assigned
+
+
+# --- JSON-lines decks ---------------------------------------------------------
+
+def _dump_line(card):
+    # "id" first so an index can be rebuilt from line prefixes alone.
+    ordered = {"id": card["id"]}
+    ordered.update((k, v) for k, v in card.items() if k != "id")
+    return json.dumps(ordered, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def write_jsonl(cards, path):
+    """
+    Write `cards` (ids are assigned if missing) one per line, plus a sidecar
+    `<path>.idx` holding {card_id: byte_offset}. Returns the offsets.
+    """
+    offsets = {}
+    with open(path, "wb") as f:
+        for card in assign_card_ids(cards):
+            offsets[card["id"]] = f.tell()
+            f.write(_dump_line(card))
+    with open(path + ".idx", "w", encoding="utf-8") as f:
+        json.dump(offsets, f, separators=(",", ":"))
+    return offsets
+
+
+_ID_PREFIX = re.compile(rb'\{"id":\s*"([^"]+)"')
+
+
+def _scan_offsets(buf):
+    offsets = {}
+    pos = 0
+    size = len(buf)
+    while pos < size:
+        end = buf.find(b"\n", pos)
+        if end == -1:
+            end = size
+        match = _ID_PREFIX.match(buf, pos, end)
+        if match:
+            offsets[match.group(1).decode("utf-8")] = pos
+        else:
+            line = bytes(buf[pos:end]).strip()
+            if line:
+                card_id = json.loads(line).get("id")
+                if card_id:
+                    offsets[card_id] = pos
+        pos = end + 1
+    return offsets
+
+
+class JsonlDeckIndex:
+    """
+    id -> (file, byte offset) over one or more JSON-lines deck files opened
+    with mmap. `get()` parses a single line; the rest of the deck is never
+    decoded.
+    """
+
+    def __init__(self, paths):
+        if isinstance(paths, (str, os.PathLike)):
+            paths = [paths]
+        self.paths = [os.fspath(p) for p in paths]
+        self._files = []
+        self._maps = []
+        self.offsets = {}
+        for file_no, path in enumerate(self.paths):
+            f = open(path, "rb")
+            self._files.append(f)
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(path) else b""
+            self._maps.append(buf)
+            for card_id, offset in self._load_offsets(path, buf).items():
+                self.offsets[card_id] = (file_no, offset)
+
+    @staticmethod
+    def _load_offsets(path, buf):
+        idx_path = path + ".idx"
+        if os.path.exists(idx_path) and os.path.getmtime(idx_path) >= os.path.getmtime(path):
+            with open(idx_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return _scan_offsets(buf)
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __contains__(self, card_id):
+        return card_id in self.offsets
+
+    def __iter__(self):
+        return iter(self.offsets)
+
+    def locate(self, card_id):
+        """Return (path, byte offset) for `card_id`, or None."""
+        hit = self.offsets.get(card_id)
+        if hit is None:
+            return None
+        file_no, offset = hit
+        return self.paths[file_no], offset
+
+    def get(self, card_id, default=None):
+        hit = self.offsets.get(card_id)
+        if hit is None:
+            return default
+        file_no, offset = hit
+        buf = self._maps[file_no]
+        end = buf.find(b"\n", offset)
+        if end == -1:
+            end = len(buf)
+        return json.loads(buf[offset:end])
+
+    def close(self):
+        for buf in self._maps:
+            if isinstance(buf, mmap.mmap):
+                buf.close()
+        for f in self._files:
+            f.close()
+        self._maps = []
+        self._files = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_deck_file(path):
+    """
+    Load every card from a data.json-style file ({"flashcards": [...]} or a
+    raw list) or a JSON-lines deck.
+    """
+    if path.endswith(".jsonl"):
+        with open(path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, dict) and isinstance(data.get("flashcards"), list):
+        return data["flashcards"]
+    if isinstance(data, list):
+        return data
+    return []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a deck to JSON lines with a card id index.")
+    parser.add_argument("source", help="data.json or .jsonl deck")
+    parser.add_argument("dest", help="output .jsonl path (an .idx sidecar is written next to it)")
+    args = parser.parse_args(argv)
+    offsets = write_jsonl(read_deck_file(args.source), args.dest)
+    print("wrote {} cards to {}".format(len(offsets), args.dest))
+
+
+if __name__ == "__main__":
+    main()
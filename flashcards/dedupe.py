@@ -0,0 +1,188 @@
+"""
+Find near-duplicate cards with MinHash and locality-sensitive hashing.
+
+Each card becomes a set of shingles: runs of SHINGLE English words (from
+english, or question and answer for IELTS cards) and runs of SHINGLE Chinese
+characters. A MinHash signature of BANDS * ROWS hashes estimates the Jaccard
+similarity of two cards' sets. Signatures are split into BANDS bands, and
+cards of the same type that agree on any whole band become candidate pairs.
+Candidates whose estimated similarity reaches the threshold are reported,
+grouped into clusters.
+
+Everything is hashed in NumPy over the whole deck, and candidates only come
+from shared band buckets, so time grows about linearly with deck size
+rather than with the number of pairs. Large buckets are reported as a
+star of pairs around one card, so a card copied a hundred times gives 99
+pairs in one cluster rather than 4,950.
+
+    python -m flashcards.dedupe data.json --threshold 0.5
+"""
+
+import argparse
+import json
+import re
+
+import numpy as np
+
+SHINGLE = 3
+BANDS = 16
+ROWS = 4
+DEFAULT_THRESHOLD = 0.5
+# Buckets bigger than this (many copies of one card, or boilerplate shared
+# by many cards) are paired as a star around their first member instead of
+# all with all, which would be quadratic. The clusters come out the same.
+MAX_BUCKET = 50
+
+_WORD_RE = re.compile(r"[a-z0-9']+|\0")
+_CJK_START = 0x3400
+_FULLWIDTH = (0xFF00, 0xFFEF)
+# Shingles hashed at once: keeps the (shingles x hashes) matrix near 8 MB.
+_CHUNK = (1 << 20) // (BANDS * ROWS)
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def _english(card):
+    if card.get("type") == "ielts_questions":
+        return "{} {}".format(card.get("question") or "", card.get("answer") or "")
+    english = card.get("english") or ""
+    return " ".join(english) if isinstance(english, (list, tuple)) else english
+
+
+def _mix(values):
+    # splitmix64 finaliser: spreads nearby integers over all 64 bits.
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def _runs(ids, doc, salt):
+    """Hashes of every SHINGLE consecutive ids within one document, with their document."""
+    if len(ids) < SHINGLE:
+        return np.empty(0, np.uint64), np.empty(0, np.int64)
+    same_doc = doc[SHINGLE - 1:] == doc[:len(doc) - SHINGLE + 1]
+    hashes = np.full(len(ids) - SHINGLE + 1, np.uint64(salt))
+    for offset in range(SHINGLE):
+        hashes = _mix(hashes * _MIX + ids[offset:len(ids) - SHINGLE + 1 + offset])
+    return hashes[same_doc], doc[:len(doc) - SHINGLE + 1][same_doc]
+
+
+def shingles(cards):
+    """(hashes, doc): one uint64 per shingle and the index of the card it belongs to."""
+    with np.errstate(over="ignore"):
+        tokens = _WORD_RE.findall("\0".join(_english(card).lower() for card in cards) + "\0")
+        vocab = {"\0": 0}
+        ids = np.fromiter((vocab.setdefault(token, len(vocab)) for token in tokens), np.uint64, len(tokens))
+        ends = ids == 0
+        doc = np.cumsum(ends) - ends
+        words = _runs(ids[~ends], doc[~ends], 1)
+
+        text = "\0".join((card.get("chinese") or "") for card in cards) + "\0"
+        codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        ends = codes == 0
+        doc = np.cumsum(ends) - ends
+        keep = (codes >= _CJK_START) & ~((codes >= _FULLWIDTH[0]) & (codes <= _FULLWIDTH[1]))
+        chars = _runs(codes[keep], doc[keep], 2)
+    return np.concatenate([words[0], chars[0]]), np.concatenate([words[1], chars[1]])
+
+
+def minhash_signatures(cards, seed=0):
+    """
+    (len(cards), BANDS * ROWS) uint64 MinHash signatures. Cards without any
+    shingle get all-max rows and are flagged False in the returned mask.
+    """
+    hashes, doc = shingles(cards)
+    rng = np.random.default_rng(seed)
+    salts = rng.integers(1, 2 ** 63, size=BANDS * ROWS, dtype=np.uint64)
+    signatures = np.full((len(cards), BANDS * ROWS), np.iinfo(np.uint64).max, dtype=np.uint64)
+    order = np.argsort(doc, kind="stable")
+    hashes, doc = hashes[order], doc[order]
+    start = 0
+    with np.errstate(over="ignore"):
+        while start < len(doc):
+            stop = min(len(doc), start + _CHUNK)
+            while stop < len(doc) and doc[stop] == doc[stop - 1]:
+                stop += 1
+            block = _mix(hashes[start:stop, None] ^ salts[None, :])
+            firsts = np.flatnonzero(np.r_[True, doc[start + 1:stop] != doc[start:stop - 1]])
+            signatures[doc[start:stop][firsts]] = np.minimum.reduceat(block, firsts, axis=0)
+            start = stop
+    has_shingles = np.zeros(len(cards), dtype=bool)
+    has_shingles[doc] = True
+    return signatures, has_shingles
+
+
+def near_duplicates(cards, threshold=DEFAULT_THRESHOLD):
+    """[(i, j, estimated similarity)] for card index pairs of the same type, i < j."""
+    signatures, usable = minhash_signatures(cards)
+    types = [card.get("type") or "" for card in cards]
+    pairs = set()
+    for band in range(BANDS):
+        rows = signatures[:, band * ROWS:(band + 1) * ROWS]
+        with np.errstate(over="ignore"):
+            keys = _mix(rows[:, 0])
+            for column in range(1, ROWS):
+                keys = _mix(keys * _MIX + rows[:, column])
+        buckets = {}
+        for i in np.flatnonzero(usable):
+            buckets.setdefault((types[i], int(keys[i])), []).append(int(i))
+        for members in buckets.values():
+            if len(members) <= MAX_BUCKET:
+                pairs.update((a, b) for k, a in enumerate(members) for b in members[k + 1:])
+            else:
+                pairs.update((members[0], b) for b in members[1:])
+    found = []
+    for i, j in sorted(pairs):
+        similarity = float(np.mean(signatures[i] == signatures[j]))
+        if similarity >= threshold:
+            found.append((i, j, similarity))
+    return found
+
+
+def clusters(pairs):
+    """Group pairs into connected clusters (lists of indices, sorted)."""
+    parent = {}
+
+    def root(i):
+        parent.setdefault(i, i)
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j, _ in pairs:
+        parent[root(i)] = root(j)
+    groups = {}
+    for i in parent:
+        groups.setdefault(root(i), []).append(i)
+    return sorted((sorted(group) for group in groups.values()), key=lambda group: group[0])
+
+
+def main(argv=None):
+    from flashcards.deck import assign_card_ids, read_deck_file
+
+    parser = argparse.ArgumentParser(description="Report near-duplicate cards in a deck.")
+    parser.add_argument("deck", help="data.json or .jsonl deck")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="minimum estimated Jaccard similarity (default: %(default)s)")
+    parser.add_argument("--json", action="store_true", help="print pairs as JSON lines")
+    args = parser.parse_args(argv)
+    cards = assign_card_ids(read_deck_file(args.deck))
+    pairs = near_duplicates(cards, args.threshold)
+    if args.json:
+        for i, j, similarity in pairs:
+            print(json.dumps({"a": cards[i]["id"], "b": cards[j]["id"], "similarity": similarity}))
+        return
+    groups = clusters(pairs)
+    best = {}
+    for i, j, similarity in pairs:
+        best[i] = max(best.get(i, 0), similarity)
+        best[j] = max(best.get(j, 0), similarity)
+    for group in groups:
+        print("{} ({} cards)".format(cards[group[0]].get("type"), len(group)))
+        for i in group:
+            print("  {}  {:.2f}  {}".format(cards[i]["id"], best[i], _english(cards[i])[:80]))
+    print("{} near-duplicate pairs in {} clusters, {} cards".format(len(pairs), len(groups), len(cards)))
+
+
+if __name__ == "__main__":
+    main()
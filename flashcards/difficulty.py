@@ -0,0 +1,121 @@
+"""
+Card difficulty, computed over the whole deck with NumPy.
+
+Signals per card:
+
+  length    words in the English (the model answer for IELTS cards)
+  advanced  number of advancedVocab entries
+  phrasal   number of phrasalVerbs
+  rarity    mean surprisal, -log p(word) across the deck, of its
+            RARE_WORDS least common words
+
+Each signal is log-scaled where it is a count, standardised within the card
+type and combined with WEIGHTS. The result is ranked within the type and
+cut into LEVELS levels, 1 (easiest) to LEVELS (hardest). That level is
+stored on each card as `difficulty`. Levels rather than raw scores keep a
+deck edit from nudging every card's value, so deltas stay small.
+
+The page uses the levels for its "easy -> hard" order and for sampling
+harder cards more often.
+
+    python -m flashcards.difficulty data.json
+"""
+
+import argparse
+import re
+
+import numpy as np
+
+from flashcards.cards import with_field
+
+LEVELS = 10
+SIGNALS = ("length", "advanced", "phrasal", "rarity")
+WEIGHTS = np.array([1.0, 0.75, 0.75, 1.0])
+RARE_WORDS = 3
+
+_WORD_RE = re.compile(r"[a-z']+|\0")
+
+
+def card_text(card):
+    if card.get("type") == "ielts_questions":
+        return card.get("answer") or ""
+    english = card.get("english") or ""
+    return " ".join(english) if isinstance(english, (list, tuple)) else english
+
+
+def difficulty_signals(cards):
+    """(len(cards), len(SIGNALS)) array of raw signals, in deck order."""
+    # One tokenizer pass over the whole deck; NUL marks where each card ends.
+    tokens = _WORD_RE.findall("\0".join(card_text(card).lower() for card in cards) + "\0")
+    # Word ids in order of first appearance; NUL is id 0.
+    vocab = {"\0": 0}
+    ids = np.fromiter((vocab.setdefault(token, len(vocab)) for token in tokens), np.int64, len(tokens))
+    ends = ids == 0
+    doc = np.cumsum(ends) - ends
+    words, doc = ids[~ends], doc[~ends]
+
+    counts = np.bincount(words, minlength=len(vocab))
+    surprisal = -np.log(counts[words] / max(len(words), 1))
+    length = np.bincount(doc, minlength=len(cards)).astype(float)
+
+    # Rarity looks at each card's RARE_WORDS least common words, so the
+    # function words every sentence has do not dilute it.
+    order = np.lexsort((-surprisal, doc))
+    starts = np.concatenate(([0], np.cumsum(length)[:-1])).astype(int)
+    position = np.arange(len(order)) - starts[doc[order]]
+    rarest = order[position < RARE_WORDS]
+    rarity = (np.bincount(doc[rarest], weights=surprisal[rarest], minlength=len(cards))
+              / np.maximum(np.minimum(length, RARE_WORDS), 1))
+
+    advanced = np.fromiter((len(card.get("advancedVocab") or ()) for card in cards), float, len(cards))
+    phrasal = np.fromiter((len(card.get("phrasalVerbs") or ()) for card in cards), float, len(cards))
+    return np.column_stack([length, advanced, phrasal, rarity])
+
+
+def difficulty_levels(cards):
+    """Difficulty level, 1..LEVELS, for every card, ranked within its type."""
+    signals = difficulty_signals(cards)
+    signals[:, :3] = np.log1p(signals[:, :3])
+    types = np.array([card.get("type") or "" for card in cards], dtype=str)
+    levels = np.ones(len(cards), dtype=int)
+    for card_type in np.unique(types):
+        members = np.flatnonzero(types == card_type)
+        group = signals[members]
+        spread = group.std(axis=0)
+        z = (group - group.mean(axis=0)) / np.where(spread == 0, 1, spread)
+        score = z @ WEIGHTS
+        # Stable ranking: equal scores keep deck order.
+        rank = np.empty(len(members))
+        rank[np.argsort(score, kind="stable")] = np.arange(len(members))
+        levels[members] = 1 + (rank * LEVELS // max(len(members), 1)).astype(int)
+    return levels
+
+
+def attach_difficulty(cards):
+    """Return `cards` with `difficulty` set; cards whose level did not change are kept as they are."""
+    levels = difficulty_levels(cards) if cards else ()
+    return [with_field(card, "difficulty", int(level)) for card, level in zip(cards, levels)]
+
+
+def main(argv=None):
+    from flashcards.deck import assign_card_ids, read_deck_file
+
+    parser = argparse.ArgumentParser(description="Show the easiest and hardest cards of each type.")
+    parser.add_argument("deck", help="data.json or .jsonl deck")
+    parser.add_argument("--show", type=int, default=3, help="cards to show at each end (default: %(default)s)")
+    args = parser.parse_args(argv)
+    cards = assign_card_ids(read_deck_file(args.deck))
+    levels = difficulty_levels(cards)
+    by_type = {}
+    for card, level in zip(cards, levels):
+        by_type.setdefault(card.get("type"), []).append((int(level), card))
+    for card_type, ranked in by_type.items():
+        ranked.sort(key=lambda item: item[0])
+        print(card_type)
+        for label, picks in (("easy", ranked[:args.show]), ("hard", ranked[-args.show:])):
+            for level, card in picks:
+                print("  {:<4} {:>2}  {}".format(label, level, (card.get("question") or card_text(card))[:70]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1699 @@
+// Deck contents arrive from Streamlit (see flashcards/sync.py) and are cached in IndexedDB.
+let flashcardData = [];
+let initialCardId = '';
+
+let filteredData = [];
+let cardIndex = 0;
+let showTranslation = false;
+
+const deckTitle = document.getElementById('deck-title');
+const chineseText = document.getElementById('chinese-text');
+const englishText = document.getElementById('english-text');
+const cardCounter = document.getElementById('card-counter');
+const verbGroupDisplay = document.getElementById('verb-group');
+const ieltsQuestion = document.getElementById('ielts-question');
+const ieltsAnswer = document.getElementById('ielts-answer');
+const ieltsSynonyms = document.getElementById('ielts-synonyms');
+const showHideBtn = document.getElementById('show-hide-btn');
+const nextBtn = document.getElementById('next-btn');
+const shuffleBtn = document.getElementById('shuffle-btn');
+const cardTypeRadios = document.getElementsByName('card_type');
+const studyModeSelect = document.getElementById('study-mode');
+const cardOrderSelect = document.getElementById('card-order');
+const quizOptions = document.getElementById('quiz-options');
+const recallBox = document.getElementById('recall-box');
+const recallInput = document.getElementById('recall-input');
+const recallResult = document.getElementById('recall-result');
+const usedIn = document.getElementById('used-in');
+const mixRatiosBox = document.getElementById('mix-ratios');
+const leitnerButtons = document.getElementById('leitner-buttons');
+const knewBtn = document.getElementById('knew-btn');
+const missedBtn = document.getElementById('missed-btn');
+const mixRatioInputs = document.querySelectorAll('[data-mix-type]');
+
+function shuffleArray(array) {
+  for (let i = array.length - 1; i > 0; i--) {
+    const j = Math.floor(Math.random() * (i + 1));
+    [array[i], array[j]] = [array[j], array[i]];
+  }
+}
+
+// Kept in sync by the radio change handler instead of querying the DOM per render.
+let selectedType = document.querySelector('input[name="card_type"]:checked')?.value || 'sentence';
+let studyMode = studyModeSelect?.value || 'flashcards';
+let cardOrder = cardOrderSelect?.value || 'shuffle';
+
+// Cards carry a difficulty level, 1 (easy) to 10, from the build (flashcards/difficulty.py).
+function orderCards(cards) {
+  shuffleArray(cards);
+  if (cardOrder === 'easy-first') {
+    // Stable sort: shuffled within each level.
+    cards.sort((a, b) => (a.difficulty || 0) - (b.difficulty || 0));
+  } else if (cardOrder === 'weighted') {
+    // Weighted random order (Efraimidis-Spirakis keys): the chance of coming
+    // up before another card grows with the card's level.
+    const keys = new Map(cards.map(card => [card, Math.pow(Math.random(), 1 / (card.difficulty || 1))]));
+    cards.sort((a, b) => keys.get(b) - keys.get(a));
+  }
+}
+
+function filterAndShuffleCards() {
+  if (selectedType === MIXED) {
+    // Mixed sessions keep only the cards shown so far; see drawMixedCard().
+    timed('shuffle', () => startMixedSession(studyMode === 'leitner' ? leitnerCards() : flashcardData || []));
+    const first = drawMixedCard();
+    filteredData = first ? [first] : [];
+  } else if (studyMode === 'leitner') {
+    // Due order, lowest box first.
+    filteredData = timed('filter', () => leitnerCards(selectedType));
+  } else {
+    filteredData = timed('filter', () => (flashcardData || []).filter(card => card.type === selectedType));
+    timed('shuffle', () => orderCards(filteredData));
+  }
+  if (mixRatiosBox) {
+    mixRatiosBox.style.display = selectedType === MIXED ? 'flex' : 'none';
+  }
+  cardIndex = 0;
+  showTranslation = false;
+  jumpedFrom = null;
+}
+
+// --- Mixed sessions ---------------------------------------------------------------
+//
+// The "Mixed" type interleaves the card types in the ratios set next to it.
+// Each type has its own queue, which hands out one card at a time in the
+// chosen order, and a heap merges the queues: a type's next turn comes
+// 1/ratio after its last one (stride scheduling), so at 3:1 three sentences
+// come up, evenly spread, for every IELTS question. The mixed order is never
+// built up front, only the cards already shown are kept (in filteredData),
+// so a session starts at once however large the deck.
+
+const MIXED = 'mixed';
+const MIX_TYPES = ['sentence', 'vocabulary', 'phrasal_verbs', 'ielts_questions'];
+
+// Binary heap; `before(a, b)` is true when a comes out first.
+class Heap {
+  constructor(before, items) {
+    this.before = before;
+    this.items = items || [];
+    for (let i = (this.items.length >> 1) - 1; i >= 0; i--) {
+      this.siftDown(i);
+    }
+  }
+
+  get size() {
+    return this.items.length;
+  }
+
+  push(item) {
+    const items = this.items;
+    items.push(item);
+    let i = items.length - 1;
+    while (i > 0) {
+      const parent = (i - 1) >> 1;
+      if (!this.before(items[i], items[parent])) {
+        break;
+      }
+      [items[i], items[parent]] = [items[parent], items[i]];
+      i = parent;
+    }
+  }
+
+  pop() {
+    const items = this.items;
+    const top = items[0];
+    const last = items.pop();
+    if (items.length > 0) {
+      items[0] = last;
+      this.siftDown(0);
+    }
+    return top;
+  }
+
+  siftDown(i) {
+    const items = this.items;
+    for (;;) {
+      const left = 2 * i + 1;
+      const right = left + 1;
+      let first = i;
+      if (left < items.length && this.before(items[left], items[first])) {
+        first = left;
+      }
+      if (right < items.length && this.before(items[right], items[first])) {
+        first = right;
+      }
+      if (first === i) {
+        return;
+      }
+      [items[i], items[first]] = [items[first], items[i]];
+      i = first;
+    }
+  }
+}
+
+// A random order drawn one card at a time (a Fisher-Yates step per draw).
+function randomQueue(cards) {
+  const pool = cards.slice();
+  let left = pool.length;
+  return () => {
+    if (left === 0) {
+      return null;
+    }
+    const j = Math.floor(Math.random() * left--);
+    [pool[j], pool[left]] = [pool[left], pool[j]];
+    return pool[left];
+  };
+}
+
+// A lazy queue over `cards` in the Order setting, the same orders as
+// orderCards(); returns a function giving the next card, or null at the end.
+// Cards are grouped by difficulty level once; each draw is then O(levels).
+function cardQueue(cards) {
+  if (studyMode === 'leitner') {
+    let i = 0;
+    return () => i < cards.length ? cards[i++] : null;
+  }
+  if (cardOrder !== 'easy-first' && cardOrder !== 'weighted') {
+    return randomQueue(cards);
+  }
+  const byLevel = new Map();
+  cards.forEach(card => {
+    const level = card.difficulty || 1;
+    if (!byLevel.has(level)) {
+      byLevel.set(level, []);
+    }
+    byLevel.get(level).push(card);
+  });
+  const levels = [...byLevel.keys()].sort((a, b) => a - b)
+    .map(level => ({ level, left: byLevel.get(level).length, next: randomQueue(byLevel.get(level)) }));
+  if (cardOrder === 'easy-first') {
+    let i = 0;
+    return () => {
+      for (; i < levels.length; i++) {
+        const card = levels[i].next();
+        if (card) {
+          return card;
+        }
+      }
+      return null;
+    };
+  }
+  // Weighted: pick a level with odds level x cards left in it, then a card in
+  // it; the same order, in distribution, as orderCards()' weighted keys.
+  return () => {
+    const weight = levels.reduce((sum, entry) => sum + entry.level * entry.left, 0);
+    let r = Math.random() * weight;
+    for (const entry of levels) {
+      if (entry.left > 0 && (r -= entry.level * entry.left) < 0) {
+        entry.left--;
+        return entry.next();
+      }
+    }
+    const last = levels.filter(entry => entry.left > 0).pop();
+    if (last) {
+      last.left--;
+      return last.next();
+    }
+    return null;
+  };
+}
+
+let mixedSession = null;
+
+function mixRatios() {
+  const ratios = {};
+  MIX_TYPES.forEach(type => { ratios[type] = 1; });
+  mixRatioInputs.forEach(input => {
+    ratios[input.dataset.mixType] = Math.max(0, Number(input.value) || 0);
+  });
+  return ratios;
+}
+
+// Queue every type with a ratio above zero. Cards in `skip` (already shown)
+// wait for the next round of their type.
+function startMixedSession(cards, skip) {
+  const ratios = mixRatios();
+  const byType = new Map(MIX_TYPES.map(type => [type, []]));
+  cards.forEach(card => {
+    const list = byType.get(card.type);
+    if (list) {
+      list.push(card);
+    }
+  });
+  const lanes = MIX_TYPES
+    .filter(type => ratios[type] > 0 && byType.get(type).length > 0)
+    .map((type, order) => {
+      const all = byType.get(type);
+      const pending = skip ? all.filter(card => !skip.has(card.id)) : all;
+      return { type, order, cards: all, next: cardQueue(pending), stride: 1 / ratios[type], pass: 1 / ratios[type] };
+    });
+  mixedSession = {
+    lanes: new Heap((a, b) => a.pass < b.pass || (a.pass === b.pass && a.order < b.order), lanes),
+    total: lanes.reduce((sum, lane) => sum + lane.cards.length, 0)
+  };
+}
+
+// The next card of the mixed session: the type whose turn is due, its next
+// card. A type that has shown all its cards starts another round (in Leitner
+// mode it drops out instead).
+function drawMixedCard() {
+  const lanes = mixedSession ? mixedSession.lanes : null;
+  if (!lanes || lanes.size === 0) {
+    return null;
+  }
+  const lane = lanes.pop();
+  let card = lane.next();
+  if (!card && studyMode !== 'leitner') {
+    lane.next = cardQueue(lane.cards);
+    card = lane.next();
+  }
+  if (!card) {
+    // Leitner mode: this type has no more cards due today.
+    return drawMixedCard();
+  }
+  lane.pass += lane.stride;
+  lanes.push(lane);
+  return card;
+}
+
+// Character trie over a card's Chinese phrases, built once per phrasalVerbs array.
+const chinesePhraseTries = new WeakMap();
+
+function getChinesePhraseTrie(phrasalVerbs) {
+  let trie = chinesePhraseTries.get(phrasalVerbs);
+  if (trie) {
+    return trie;
+  }
+  trie = { next: new Map(), end: false };
+  phrasalVerbs.forEach(pv => {
+    const phrase = (pv.chinese || '').toLowerCase();
+    if (!phrase) {
+      return;
+    }
+    let node = trie;
+    for (let i = 0; i < phrase.length; i++) {
+      let child = node.next.get(phrase[i]);
+      if (!child) {
+        child = { next: new Map(), end: false };
+        node.next.set(phrase[i], child);
+      }
+      node = child;
+    }
+    node.end = true;
+  });
+  chinesePhraseTries.set(phrasalVerbs, trie);
+  return trie;
+}
+
+// Single left-to-right scan taking the longest phrase at each position.
+// Matched text is skipped, so spans are never nested or overlapping, and
+// the cost is the text length times the longest phrase length.
+function highlightChinesePhrases(text, phrasalVerbs, className) {
+  const trie = getChinesePhraseTrie(phrasalVerbs);
+  const lowered = text.toLowerCase();
+  const haystack = lowered.length === text.length ? lowered : text;
+  let out = '';
+  let plainStart = 0;
+  let i = 0;
+  while (i < text.length) {
+    let node = trie;
+    let matchEnd = -1;
+    for (let j = i; j < text.length; j++) {
+      node = node.next.get(haystack[j]);
+      if (!node) {
+        break;
+      }
+      if (node.end) {
+        matchEnd = j + 1;
+      }
+    }
+    if (matchEnd > 0) {
+      out += text.slice(plainStart, i) + `<span class="${className}">${text.slice(i, matchEnd)}</span>`;
+      i = matchEnd;
+      plainStart = i;
+    } else {
+      i++;
+    }
+  }
+  return out + text.slice(plainStart);
+}
+
+function highlightPhrasalVerbs(text, phrasalVerbs, isChinese, verbFormsByVerb) {
+  if (!phrasalVerbs || !Array.isArray(phrasalVerbs) || phrasalVerbs.length === 0) {
+    return text;
+  }
+  if (isChinese) {
+    return highlightChinesePhrases(text, phrasalVerbs, 'phrasal-verb');
+  }
+  let highlighted = text;
+  const className = 'phrasal-verb-en';
+  
+  // Sort by length (longest first) to avoid partial matches
+  const sorted = [...phrasalVerbs].sort((a, b) => b.english.length - a.english.length);
+
+  sorted.forEach(pv => {
+    const pvText = pv.english;
+    
+    // For English, handle tense variations including irregular verbs
+    // Split phrasal verb into verb and particle(s)
+    const parts = pvText.trim().split(/\s+/);
+    if (parts.length >= 2) {
+      const baseVerb = parts[0].toLowerCase();
+      const particle = parts.slice(1).join(' ');
+      
+      const escapedParticle = particle.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+
+      // Inflected forms come with the card (flashcards/lexicon.py verb_forms);
+      // without them, fall back to adding regular endings.
+      const verbForms = (verbFormsByVerb && verbFormsByVerb[baseVerb]) || [
+        baseVerb,
+        baseVerb + 's',
+        baseVerb + 'ed',
+        baseVerb + 'ing',
+        baseVerb + 'es'
+      ];
+      
+      // Create pattern matching any of the verb forms followed by particle
+      const verbPattern = verbForms.map(v => v.replace(/[.*+?^${}()|[\]\\]/g, '\\$&')).join('|');
+      const pattern = `\\b(${verbPattern})\\s+${escapedParticle}\\b`;
+      const regex = new RegExp(pattern, 'gi');
+      
+      highlighted = highlighted.replace(regex, (match) => {
+        return `<span class="${className}">${match}</span>`;
+      });
+    } else {
+      // Single word phrasal verb (less common, use exact match with tense variations)
+      const baseWord = pvText.toLowerCase();
+      const pattern = `\\b${baseWord}[a-z]*\\b`;
+      const regex = new RegExp(pattern, 'gi');
+      highlighted = highlighted.replace(regex, (match) => {
+        if (match.toLowerCase().startsWith(baseWord)) {
+          return `<span class="${className}">${match}</span>`;
+        }
+        return match;
+      });
+    }
+  });
+
+  return highlighted;
+}
+
+function highlightIELTSAnswer(text, logicalConnectives, phrasalVerbs, advancedVocab, phrasalVerbTranslations) {
+  let highlighted = text;
+  
+  // Helper function to avoid matching inside HTML tags
+  function replaceNotInTags(text, pattern, replacement) {
+    // Split by HTML tags, process text parts only
+    const parts = text.split(/(<[^>]+>)/);
+    for (let i = 0; i < parts.length; i += 2) {
+      // Only process text parts (even indices)
+      if (parts[i]) {
+        parts[i] = parts[i].replace(pattern, replacement);
+      }
+    }
+    return parts.join('');
+  }
+  
+  // Highlight logical connectives
+  if (logicalConnectives && logicalConnectives.length > 0) {
+    logicalConnectives.forEach(conn => {
+      const escaped = conn.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+      const regex = new RegExp(`\\b${escaped}\\b`, 'gi');
+      highlighted = replaceNotInTags(highlighted, regex, (match) => {
+        return `<span class="logical-connective">${match}</span>`;
+      });
+    });
+  }
+  
+  // Highlight phrasal verbs with Chinese translation (sort by length, longest first)
+  if (phrasalVerbs && phrasalVerbs.length > 0) {
+    const sortedPhrasalVerbs = [...phrasalVerbs].sort((a, b) => b.length - a.length);
+    sortedPhrasalVerbs.forEach(pv => {
+      const translation = (phrasalVerbTranslations || {})[pv.toLowerCase()] || '';
+      const parts = pv.trim().split(/\s+/);
+      if (parts.length >= 2) {
+        const baseVerb = parts[0].toLowerCase();
+        const particle = parts.slice(1).join(' ');
+        const escapedParticle = particle.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+        const pattern = new RegExp(`\\b${baseVerb}[a-z]*\\s+${escapedParticle}\\b`, 'gi');
+        highlighted = replaceNotInTags(highlighted, pattern, (match) => {
+          if (translation) {
+            return `<span class="phrasal-verb-en">${match}</span><span class="phrasal-verb-translation"> ${translation}</span>`;
+          }
+          return `<span class="phrasal-verb-en">${match}</span>`;
+        });
+      } else {
+        // Single word phrasal verb
+        const escaped = pv.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+        const regex = new RegExp(`\\b${escaped}\\b`, 'gi');
+        highlighted = replaceNotInTags(highlighted, regex, (match) => {
+          if (translation) {
+            return `<span class="phrasal-verb-en">${match}</span><span class="phrasal-verb-translation"> ${translation}</span>`;
+          }
+          return `<span class="phrasal-verb-en">${match}</span>`;
+        });
+      }
+    });
+  }
+  
+  // Highlight advanced vocabulary with Chinese translation (sort by length, longest first)
+  if (advancedVocab && Array.isArray(advancedVocab)) {
+    const sortedVocab = [...advancedVocab].sort((a, b) => {
+      const aWord = (a.word || a).toLowerCase();
+      const bWord = (b.word || b).toLowerCase();
+      return bWord.length - aWord.length;
+    });
+    
+    sortedVocab.forEach(vocab => {
+      const word = vocab.word || vocab;
+      const translation = vocab.translation || '';
+      const escaped = word.replace(/[.*+?^${}()|[\]\\]/g, '\\$&');
+      const regex = new RegExp(`\\b${escaped}\\b`, 'gi');
+      highlighted = replaceNotInTags(highlighted, regex, (match) => {
+        if (translation) {
+          return `<span class="advanced-vocab">${match}</span><span class="advanced-vocab-translation"> ${translation}</span>`;
+        }
+        return `<span class="advanced-vocab">${match}</span>`;
+      });
+    });
+  }
+  
+  return highlighted;
+}
+
+// Paragraph boundaries are computed at deck build time (answerParagraphs),
+// so each slice of the answer is highlighted on its own and wrapped in a block.
+function renderIELTSParagraphs(card) {
+  const paragraphs = card.answerParagraphs || [{ marker: null, start: 0, end: card.answer.length }];
+  const hasHighlights = card.logicalConnectives || card.phrasalVerbs || card.advancedVocab;
+  return paragraphs.map(p => {
+    const text = card.answer.slice(p.start, p.end);
+    const body = hasHighlights
+      ? highlightIELTSAnswer(text, card.logicalConnectives, card.phrasalVerbs, card.advancedVocab, card.phrasalVerbTranslations)
+      : text;
+    return `<div class="ielts-paragraph" data-marker="${p.marker || ''}">${body}</div>`;
+  }).join('');
+}
+
+function generateSynonymsSection(advancedVocab, vocabSynonyms) {
+  if (!advancedVocab || !Array.isArray(advancedVocab) || advancedVocab.length === 0) {
+    return '';
+  }
+  
+  let html = '<div class="synonyms-title">Synonyms or Paraphrases:</div>';
+  
+  advancedVocab.forEach(vocab => {
+    const word = vocab.word || vocab;
+    const synonyms = (vocabSynonyms || {})[word.toLowerCase()];
+    
+    if (synonyms && synonyms.length > 0) {
+      html += `<div class="synonym-item">`;
+      html += `<strong>${word}:</strong> `;
+      const synonymTexts = synonyms.map(s => 
+        `<span class="synonym-word">${s.word}</span><span class="synonym-translation"> ${s.translation}</span>`
+      ).join(', ');
+      html += synonymTexts;
+      html += `</div>`;
+    }
+  });
+  
+  return html;
+}
+
+// --- Multiple-choice quiz ---------------------------------------------------------
+//
+// The wrong options are precomputed per deck version (see flashcards/quiz.py)
+// and arrive as each card's `distractors` ids, so a question is a few lookups.
+
+const QUIZ_TYPES = ['sentence', 'vocabulary', 'phrasal_verbs'];
+let cardsById = new Map();
+let quiz = null;
+
+function optionText(card) {
+  return Array.isArray(card.english) ? card.english.join(' / ') : (card.english || '');
+}
+
+function escapeHtml(text) {
+  return text.replace(/[&<>"]/g, ch => ({ '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;' })[ch]);
+}
+
+function quizFor(card) {
+  if (!quiz || quiz.card !== card) {
+    const options = [card].concat((card.distractors || []).map(id => cardsById.get(id)).filter(Boolean));
+    shuffleArray(options);
+    quiz = { card, options, picked: null };
+  }
+  return quiz;
+}
+
+function renderQuizOptions(question) {
+  return question.options.map((option, i) => {
+    let state = '';
+    if (question.picked !== null) {
+      state = option === question.card ? ' correct' : i === question.picked ? ' wrong' : ' answered';
+    }
+    return `<button class="quiz-option${state}" data-option="${i}">${i + 1}. ${escapeHtml(optionText(option))}</button>`;
+  }).join('');
+}
+
+function handleQuizAnswer(index) {
+  if (!quiz || quiz.picked !== null || !quiz.options[index]) {
+    return;
+  }
+  quiz.picked = index;
+  showTranslation = true;
+  renderCard();
+}
+
+// --- Cross-references ---------------------------------------------------------------
+//
+// Vocabulary and phrasal verb cards carry `usedIn`, {term: [IELTS card ids]},
+// precomputed per deck version (see flashcards/xref.py), so listing and
+// following the answers that use a term are map lookups.
+
+// The card a cross-reference was followed from, for the way back.
+let jumpedFrom = null;
+
+function renderUsedIn(card) {
+  return Object.entries(card.usedIn).map(([term, ids]) => {
+    const links = ids.map(id => cardsById.get(id)).filter(Boolean).map(answer =>
+      `<button class="used-in-link" data-card-id="${escapeHtml(answer.id)}">${escapeHtml(answer.question || '')}</button>`
+    ).join('');
+    return links ? `<div class="used-in-term">${escapeHtml(term)}</div>${links}` : '';
+  }).join('');
+}
+
+function renderJumpBack(card) {
+  const label = Array.isArray(card.english) ? card.english[0] : (card.english || card.question || '');
+  return `<button class="used-in-link" data-card-id="${escapeHtml(card.id)}" data-back="1">&larr; Back to ${escapeHtml(label)}</button>`;
+}
+
+// Show `id` wherever it is, switching the card type if need be.
+function jumpToCard(id, back) {
+  const card = cardsById.get(id);
+  if (!card) {
+    return;
+  }
+  const from = filteredData[cardIndex];
+  if (selectedType === MIXED) {
+    // Stay in the session: the linked card is shown next, and going back
+    // takes it out again.
+    if (back && filteredData[cardIndex - 1] === card) {
+      filteredData.splice(cardIndex, 1);
+      cardIndex--;
+    } else {
+      filteredData.splice(cardIndex + 1, 0, card);
+      cardIndex++;
+    }
+  } else {
+    if (card.type !== selectedType) {
+      cardTypeRadios.forEach(radio => { radio.checked = radio.value === card.type; });
+      selectedType = card.type;
+      filterAndShuffleCards();
+    }
+    cardIndex = Math.max(0, filteredData.indexOf(card));
+  }
+  jumpedFrom = back ? null : from;
+  showTranslation = !back;
+  renderCard();
+}
+
+// --- Leitner boxes --------------------------------------------------------------
+//
+// Python keeps five boxes of card ids per type for each user (see
+// flashcards/leitner.py) and, while the page is in Leitner mode, sends the
+// start of each type's queue of cards due today: {due: {type: [[id, box]]},
+// counts: {type: n}}. "Knew it" / "Missed it" post the move and drop the card
+// here at once; the next window from Python no longer has it.
+
+let leitnerDue = null;
+const leitnerBoxOf = new Map();
+// Answered here, possibly not yet applied by Python.
+const leitnerAnswered = new Set();
+
+function leitnerCards(type) {
+  if (!leitnerDue) {
+    return [];
+  }
+  const types = type ? [type] : Object.keys(leitnerDue.due);
+  const cards = [];
+  types.forEach(t => (leitnerDue.due[t] || []).forEach(([id]) => {
+    const card = cardsById.get(id);
+    if (card && !leitnerAnswered.has(id)) {
+      cards.push(card);
+    }
+  }));
+  return cards;
+}
+
+function applyLeitnerWindow(due) {
+  // Every rerun re-sends the window; only act when it changed.
+  const signature = JSON.stringify(due.due);
+  if (leitnerDue && leitnerDue.signature === signature) {
+    return;
+  }
+  const ids = new Set();
+  leitnerBoxOf.clear();
+  Object.values(due.due).forEach(entries => entries.forEach(([id, box]) => {
+    ids.add(id);
+    leitnerBoxOf.set(id, box);
+  }));
+  // Answers Python has applied are out of the window.
+  Array.from(leitnerAnswered).forEach(id => {
+    if (!ids.has(id)) {
+      leitnerAnswered.delete(id);
+    }
+  });
+  const first = !leitnerDue;
+  leitnerDue = { ...due, signature };
+  if (studyMode === 'leitner' && (first || selectedType !== MIXED)) {
+    const current = filteredData[cardIndex];
+    const reveal = showTranslation;
+    filterAndShuffleCards();
+    const index = filteredData.indexOf(current);
+    if (index >= 0) {
+      cardIndex = index;
+      showTranslation = reveal;
+    }
+    renderCard();
+  }
+}
+
+// Boxes are kept per ?user=; without one Python turns Leitner mode off here
+// rather than share one set of boxes between every anonymous learner.
+function setLeitnerEnabled(enabled) {
+  const option = studyModeSelect.querySelector('option[value="leitner"]');
+  if (!option || option.disabled === !enabled) {
+    return;
+  }
+  option.disabled = !enabled;
+  option.title = enabled ? '' : 'Open the page with ?user=<name> to keep Leitner boxes.';
+  if (!enabled && studyMode === 'leitner') {
+    studyModeSelect.value = 'flashcards';
+    studyModeSelect.dispatchEvent(new Event('change'));
+  }
+}
+
+function handleLeitnerAnswer(knew) {
+  const card = filteredData[cardIndex];
+  if (studyMode !== 'leitner' || !card || leitnerAnswered.has(card.id) || !leitnerBoxOf.has(card.id)) {
+    return;
+  }
+  leitnerAnswered.add(card.id);
+  postToPython({ kind: 'leitner-answer', type: card.type, card: card.id, box: leitnerBoxOf.get(card.id), knew });
+  if (selectedType === MIXED) {
+    handleNextCard();
+    return;
+  }
+  filteredData.splice(cardIndex, 1);
+  if (cardIndex >= filteredData.length) {
+    cardIndex = 0;
+  }
+  showTranslation = false;
+  renderCard();
+}
+
+// --- Response times -------------------------------------------------------------
+//
+// For every card shown: how long until the English was revealed and how long
+// the card stayed on screen. Records go into a fixed ring buffer and are sent
+// to Python in batches (see flashcards/timings.py), with at most one batch
+// waiting for its ack; if Python is unreachable the oldest records are
+// overwritten and counted as dropped.
+
+const TIMING_CAPACITY = 256;
+const TIMING_BATCH = 32;
+const TIMING_FLUSH_MS = 60000;
+
+const timingRing = new Array(TIMING_CAPACITY);
+let timingStart = 0;
+let timingCount = 0;
+let timingDropped = 0;
+let timingTimer = null;
+// The card on screen: {id, type, index, mode, since, shown, reveal, via}.
+let viewing = null;
+// 'key' or 'click': the kind of input being handled, for the reveal record.
+let inputVia = null;
+
+function recordTiming(record) {
+  if (timingCount === TIMING_CAPACITY) {
+    timingStart = (timingStart + 1) % TIMING_CAPACITY;
+    timingCount--;
+    timingDropped++;
+  }
+  timingRing[(timingStart + timingCount) % TIMING_CAPACITY] = record;
+  timingCount++;
+  if (timingCount >= TIMING_BATCH) {
+    flushTimings();
+  } else if (!timingTimer) {
+    timingTimer = setTimeout(flushTimings, TIMING_FLUSH_MS);
+  }
+}
+
+function flushTimings() {
+  clearTimeout(timingTimer);
+  timingTimer = null;
+  if ((timingCount === 0 && timingDropped === 0) || outbox.some(message => message.kind === 'timings')) {
+    return;
+  }
+  const records = [];
+  for (let i = 0; i < timingCount; i++) {
+    records.push(timingRing[(timingStart + i) % TIMING_CAPACITY]);
+    timingRing[(timingStart + i) % TIMING_CAPACITY] = undefined;
+  }
+  timingStart = (timingStart + timingCount) % TIMING_CAPACITY;
+  timingCount = 0;
+  postToPython({ kind: 'timings', records, dropped: timingDropped });
+  timingDropped = 0;
+}
+
+// Called by renderCard(): closes the record of the card that left the screen
+// and notes when the current one was first revealed.
+function trackCardTiming(card) {
+  const now = performance.now();
+  if (viewing && (!card || viewing.id !== card.id || viewing.index !== cardIndex)) {
+    recordTiming({
+      card: viewing.id, type: viewing.type, mode: viewing.mode, shown: viewing.shown,
+      reveal: viewing.reveal, dwell: Math.round(now - viewing.since), via: viewing.via
+    });
+    viewing = null;
+  }
+  if (card && !viewing) {
+    viewing = {
+      id: card.id, type: card.type, index: cardIndex, mode: studyMode,
+      since: now, shown: Date.now(), reveal: null, via: null
+    };
+  }
+  if (viewing && showTranslation && viewing.reveal === null) {
+    viewing.reveal = Math.round(now - viewing.since);
+    viewing.via = inputVia;
+  }
+}
+
+// --- Performance marks -----------------------------------------------------------
+//
+// Each phase of the page's work is bracketed with performance.mark() and
+// performance.measure() as "eiki:<phase>", so it shows in the browser's
+// performance panel: deck parse (inflating and applying a payload), filter,
+// shuffle, highlight (building a card's HTML) and render (renderCard's DOM
+// writes). The last PERF_SAMPLES durations of each phase are kept, and while
+// the Streamlit debug panel is open a percentile summary is sent to Python
+// every PERF_REPORT_MS.
+
+const PERF_PHASES = ['parse', 'filter', 'shuffle', 'highlight', 'render'];
+const PERF_SAMPLES = 500;
+const PERF_REPORT_MS = 5000;
+const PERCENTILES = [50, 90, 99];
+
+const perfSamples = new Map(PERF_PHASES.map(phase => [phase, { values: new Float64Array(PERF_SAMPLES), count: 0 }]));
+let perfDirty = false;
+let perfTimer = null;
+
+function perfStart(phase) {
+  performance.mark(`eiki:${phase}:start`);
+  return performance.now();
+}
+
+function perfEnd(phase, started) {
+  const name = `eiki:${phase}`;
+  const duration = performance.now() - started;
+  performance.mark(name + ':end');
+  try {
+    performance.measure(name, name + ':start', name + ':end');
+  } catch (err) {
+    // The start mark was cleared by an overlapping run of the same phase.
+  }
+  // The entries have been recorded for the performance panel; do not let the buffer grow.
+  performance.clearMarks(name + ':start');
+  performance.clearMarks(name + ':end');
+  performance.clearMeasures(name);
+  const samples = perfSamples.get(phase);
+  samples.values[samples.count % PERF_SAMPLES] = duration;
+  samples.count++;
+  perfDirty = true;
+}
+
+function timed(phase, fn) {
+  const started = perfStart(phase);
+  try {
+    return fn();
+  } finally {
+    perfEnd(phase, started);
+  }
+}
+
+// {phase: {count, p50, p90, p99, max}} in ms over the kept samples.
+function perfSummary() {
+  const summary = {};
+  perfSamples.forEach((samples, phase) => {
+    if (samples.count === 0) {
+      return;
+    }
+    const sorted = samples.values.slice(0, Math.min(samples.count, PERF_SAMPLES)).sort();
+    const entry = { count: samples.count, max: sorted[sorted.length - 1] };
+    PERCENTILES.forEach(p => {
+      entry['p' + p] = sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * p / 100))];
+    });
+    summary[phase] = entry;
+  });
+  return summary;
+}
+
+function reportPerf() {
+  // One report in flight at a time.
+  if (!perfDirty || outbox.some(message => message.kind === 'perf')) {
+    return;
+  }
+  perfDirty = false;
+  postToPython({ kind: 'perf', phases: perfSummary() });
+}
+
+function setPerfReporting(on) {
+  if (on && !perfTimer) {
+    perfDirty = true;
+    perfTimer = setInterval(reportPerf, PERF_REPORT_MS);
+  } else if (!on && perfTimer) {
+    clearInterval(perfTimer);
+    perfTimer = null;
+  }
+}
+
+// --- Typed recall ------------------------------------------------------------------
+//
+// The learner types the English; the answer is scored by token-level edit
+// distance against the card, with extra credit for each of the card's phrasal
+// verbs used in any inflected form (phrasalVerbForms, from the build).
+// Only a band of the edit-distance table around the diagonal is filled, so
+// scoring is linear in the answer length and far below a frame.
+
+const RECALL_TYPES = ['sentence', 'phrasal_verbs'];
+// Edits allowed per token of the longer text before the score bottoms out.
+const RECALL_BAND_RATIO = 0.5;
+// Tokens allowed between a verb and its particle ("put my clothes on").
+const PARTICLE_GAP = 3;
+const PHRASAL_VERB_WEIGHT = 0.3;
+let recall = null;
+
+function answerTokens(text) {
+  return text.toLowerCase().replace(/[\u2018\u2019]/g, "'").match(/[a-z0-9']+/g) || [];
+}
+
+// Levenshtein distance between token arrays, computed only within `band` of
+// the diagonal. Returns band + 1 when the distance is larger than the band.
+function bandedTokenDistance(tokensA, tokensB, band) {
+  const n = tokensA.length;
+  const m = tokensB.length;
+  if (Math.abs(n - m) > band) {
+    return band + 1;
+  }
+  // Compare small integers instead of strings in the inner loop.
+  const ids = new Map();
+  const toIds = tokens => Int32Array.from(tokens, token => {
+    let id = ids.get(token);
+    if (id === undefined) {
+      id = ids.size;
+      ids.set(token, id);
+    }
+    return id;
+  });
+  const a = toIds(tokensA);
+  const b = toIds(tokensB);
+  const over = band + 1;
+  let prev = new Int32Array(m + 1).fill(over);
+  let curr = new Int32Array(m + 1).fill(over);
+  for (let j = 0; j <= Math.min(m, band); j++) {
+    prev[j] = j;
+  }
+  for (let i = 1; i <= n; i++) {
+    const from = Math.max(1, i - band);
+    const to = Math.min(m, i + band);
+    // Cells just outside the band read as "too far".
+    curr[from - 1] = from === 1 && i <= band ? i : over;
+    if (to < m) {
+      curr[to + 1] = over;
+    }
+    let rowMin = curr[from - 1];
+    const token = a[i - 1];
+    for (let j = from; j <= to; j++) {
+      let cell = prev[j - 1] + (token === b[j - 1] ? 0 : 1);
+      if (prev[j] + 1 < cell) {
+        cell = prev[j] + 1;
+      }
+      if (curr[j - 1] + 1 < cell) {
+        cell = curr[j - 1] + 1;
+      }
+      if (cell > over) {
+        cell = over;
+      }
+      curr[j] = cell;
+      if (cell < rowMin) {
+        rowMin = cell;
+      }
+    }
+    if (rowMin > band) {
+      return over;
+    }
+    [prev, curr] = [curr, prev];
+  }
+  return prev[m];
+}
+
+// Whether `tokens` contain the phrasal verb with its verb in any listed form
+// and its particle words following within PARTICLE_GAP tokens.
+function usesPhrasalVerb(tokens, verbForms, particle) {
+  for (let i = 0; i < tokens.length; i++) {
+    if (!verbForms.includes(tokens[i])) {
+      continue;
+    }
+    for (let start = i + 1; start <= Math.min(tokens.length - particle.length, i + 1 + PARTICLE_GAP); start++) {
+      if (particle.every((word, k) => tokens[start + k] === word)) {
+        return true;
+      }
+    }
+  }
+  return false;
+}
+
+function scoreRecall(card, typed) {
+  const expected = answerTokens(card.english || '');
+  const given = answerTokens(typed);
+  const longest = Math.max(expected.length, given.length, 1);
+  const band = Math.max(2, Math.ceil(longest * RECALL_BAND_RATIO));
+  const distance = bandedTokenDistance(expected, given, band);
+  const textScore = distance > band ? 0 : 1 - distance / longest;
+
+  const phrases = [...new Set((card.phrasalVerbs || []).map(pv => pv.english.toLowerCase().trim()))];
+  const used = [];
+  const missed = [];
+  phrases.forEach(phrase => {
+    const [verb, ...particle] = phrase.split(/\s+/);
+    const forms = (card.phrasalVerbForms && card.phrasalVerbForms[verb]) || [verb];
+    (particle.length && usesPhrasalVerb(given, forms, particle) ? used : missed).push(phrase);
+  });
+  const score = phrases.length
+    ? (1 - PHRASAL_VERB_WEIGHT) * textScore + PHRASAL_VERB_WEIGHT * used.length / phrases.length
+    : textScore;
+  return { score, distance: Math.min(distance, band + 1), used, missed };
+}
+
+function renderRecallResult(result) {
+  if (!result) {
+    return '';
+  }
+  let html = `<div class="score">${Math.round(result.score * 100)}%</div>`;
+  if (result.used.length || result.missed.length) {
+    html += `<div>Phrasal verbs: ${result.used.length}/${result.used.length + result.missed.length}`;
+    if (result.missed.length) {
+      html += ` &middot; missed <span class="missed">${result.missed.map(escapeHtml).join(', ')}</span>`;
+    }
+    html += '</div>';
+  }
+  return html;
+}
+
+function handleRecallSubmit() {
+  if (!recall || recall.result) {
+    return;
+  }
+  recall.result = scoreRecall(recall.card, recallInput.value);
+  showTranslation = true;
+  renderCard();
+}
+
+// --- View state -------------------------------------------------------------------
+//
+// renderCard() describes the whole view, but these helpers only write to an
+// element when its content, visibility or class actually changes. Content is
+// keyed by (card object, kind), so flipping showTranslation or pressing Space
+// touches one or two nodes and never rebuilds HTML that is already on screen.
+
+const viewState = new Map();
+
+function viewOf(el) {
+  let state = viewState.get(el);
+  if (!state) {
+    state = {};
+    viewState.set(el, state);
+  }
+  return state;
+}
+
+function setContent(el, card, kind, produce, asText) {
+  const state = viewOf(el);
+  if (state.card === card && state.kind === kind) {
+    return;
+  }
+  const content = produce();
+  if (asText) {
+    el.innerText = content;
+  } else {
+    el.innerHTML = content;
+  }
+  state.card = card;
+  state.kind = kind;
+}
+
+function setText(el, card, kind, produce) {
+  setContent(el, card, kind, produce, true);
+}
+
+function setVisible(el, visible) {
+  const state = viewOf(el);
+  if (state.visible !== visible) {
+    el.style.display = visible ? 'block' : 'none';
+    state.visible = visible;
+  }
+}
+
+function setClass(el, className, on) {
+  const state = viewOf(el);
+  const key = 'class:' + className;
+  if (state[key] !== on) {
+    el.classList.toggle(className, on);
+    state[key] = on;
+  }
+}
+
+let rendered = null;
+
+function renderCard() {
+  const started = perfStart('render');
+  if (renderCardNow() !== false) {
+    perfEnd('render', started);
+  }
+}
+
+// Returns false when nothing on screen had to change.
+function renderCardNow() {
+  const currentCard = filteredData.length > 0 ? filteredData[cardIndex] : null;
+  trackCardTiming(currentCard);
+  // The current card's type: mixed sessions change it from card to card.
+  const cardType = currentCard ? currentCard.type : selectedType;
+  const question = currentCard && studyMode === 'quiz' && QUIZ_TYPES.includes(cardType) ? quizFor(currentCard) : null;
+  const picked = question ? question.picked : null;
+  const recalling = !!currentCard && studyMode === 'recall' && RECALL_TYPES.includes(cardType);
+  if (recalling && (!recall || recall.card !== currentCard)) {
+    recall = { card: currentCard, result: null };
+    recallInput.value = '';
+  }
+  const recallScored = recalling && !!recall.result;
+  // The empty state reads "Loading due cards..." until the window arrives.
+  const leitner = leitnerDue?.signature;
+  if (rendered && rendered.card === currentCard && rendered.type === selectedType &&
+      rendered.showTranslation === showTranslation && rendered.index === cardIndex &&
+      rendered.total === filteredData.length && rendered.question === question && rendered.picked === picked &&
+      rendered.recalling === recalling && rendered.recallScored === recallScored &&
+      rendered.jumpedFrom === jumpedFrom && rendered.mode === studyMode && rendered.leitner === leitner) {
+    return false;
+  }
+  rendered = {
+    card: currentCard, type: selectedType, showTranslation, index: cardIndex, total: filteredData.length,
+    question, picked, recalling, recallScored, jumpedFrom, mode: studyMode, leitner
+  };
+
+  const total = selectedType === MIXED ? mixedSession.total : filteredData.length;
+  const counter = currentCard ? `${cardIndex % total + 1}/${total}` : '0/0';
+  setText(cardCounter, counter, 'counter', () => counter);
+
+  setVisible(quizOptions, !!question);
+  if (question) {
+    setContent(quizOptions, question, 'quiz:' + picked, () => renderQuizOptions(question));
+  }
+  setVisible(leitnerButtons, studyMode === 'leitner' && !!currentCard);
+  setVisible(recallBox, recalling);
+  if (recalling) {
+    setContent(recallResult, recall, 'recall:' + recallScored, () => renderRecallResult(recall.result));
+  }
+
+  const linked = currentCard && showTranslation && currentCard.usedIn && Object.keys(currentCard.usedIn).length > 0;
+  const canGoBack = !!currentCard && !!jumpedFrom && cardsById.get(jumpedFrom.id) === jumpedFrom;
+  setVisible(usedIn, linked || canGoBack);
+  if (canGoBack) {
+    setContent(usedIn, jumpedFrom, 'back', () => renderJumpBack(jumpedFrom));
+  } else if (linked) {
+    setContent(usedIn, currentCard, 'usedIn', () => renderUsedIn(currentCard));
+  }
+
+  if (!currentCard) {
+    setVisible(verbGroupDisplay, false);
+    setVisible(ieltsQuestion, false);
+    setVisible(ieltsAnswer, false);
+    setVisible(ieltsSynonyms, false);
+    setVisible(chineseText, true);
+    setVisible(englishText, true);
+    const empty = studyMode !== 'leitner' ? "No cards available." : leitnerDue ? "No cards due today." : "Loading due cards...";
+    setContent(chineseText, null, 'empty:' + empty, () => empty);
+    setContent(englishText, null, 'empty', () => "");
+    setClass(englishText, 'opacity-0', true);
+    return;
+  }
+
+  const isIELTS = cardType === 'ielts_questions';
+  const showVerbGroup = cardType === 'phrasal_verbs' && !!currentCard.verbGroup;
+  setVisible(verbGroupDisplay, showVerbGroup);
+  setVisible(chineseText, !isIELTS);
+  setVisible(englishText, !isIELTS);
+  setVisible(ieltsQuestion, isIELTS);
+  setVisible(ieltsAnswer, isIELTS && showTranslation);
+  setVisible(ieltsSynonyms, isIELTS && showTranslation);
+
+  // Handle IELTS questions
+  if (isIELTS) {
+    setText(ieltsQuestion, currentCard, 'question', () => currentCard.question || "");
+    if (showTranslation && currentCard.answer) {
+      setContent(ieltsAnswer, currentCard, 'answer',
+        () => cachedFragment(currentCard, 'answer', () => renderIELTSParagraphs(currentCard)));
+      setContent(ieltsSynonyms, currentCard, 'synonyms', () => currentCard.advancedVocab
+        ? cachedFragment(currentCard, 'synonyms', () => generateSynonymsSection(currentCard.advancedVocab, currentCard.vocabSynonyms))
+        : '');
+    }
+    return;
+  }
+
+  // Regular cards (sentences, vocabulary, phrasal verbs)
+  if (showVerbGroup) {
+    setText(verbGroupDisplay, currentCard, 'verbGroup', () => `Verb: ${currentCard.verbGroup.toUpperCase()}`);
+  }
+
+  if (cardType === 'phrasal_verbs' && currentCard.phrasalVerbs) {
+    // Highlighted phrasal verbs; English is always filled in and shown via opacity
+    setContent(chineseText, currentCard, 'highlighted', () =>
+      cachedFragment(currentCard, 'chinese', () => highlightPhrasalVerbs(currentCard.chinese || "", currentCard.phrasalVerbs, true)));
+    setContent(englishText, currentCard, 'highlighted', () =>
+      cachedFragment(currentCard, 'english', () => highlightPhrasalVerbs(currentCard.english || "", currentCard.phrasalVerbs, false, currentCard.phrasalVerbForms)));
+  } else {
+    // Regular rendering for sentences and vocabulary
+    setText(chineseText, currentCard, 'plain', () => currentCard.chinese || "");
+    setText(englishText, currentCard, 'plain', () => currentCard.english || "");
+  }
+
+  setClass(englishText, 'opacity-0', !showTranslation);
+}
+
+function handleShowHide() { showTranslation = !showTranslation; renderCard(); }
+function handleNextCard() {
+  if (selectedType === MIXED) {
+    const card = cardIndex + 1 < filteredData.length ? null : drawMixedCard();
+    if (card) {
+      filteredData.push(card);
+    }
+    cardIndex = Math.min(cardIndex + 1, filteredData.length - 1);
+  } else {
+    cardIndex = (cardIndex + 1) % filteredData.length;
+  }
+  showTranslation = false;
+  jumpedFrom = null;
+  renderCard();
+}
+function handleShuffle() { filterAndShuffleCards(); renderCard(); }
+
+// Click handler for IELTS questions
+ieltsQuestion.addEventListener('click', () => {
+  if (filteredData[cardIndex]?.type === 'ielts_questions') {
+    showTranslation = !showTranslation;
+    renderCard();
+  }
+});
+
+showHideBtn.addEventListener('click', handleShowHide);
+nextBtn.addEventListener('click', handleNextCard);
+shuffleBtn.addEventListener('click', handleShuffle);
+
+usedIn.addEventListener('click', (e) => {
+  const link = e.target.closest('[data-card-id]');
+  if (link) {
+    jumpToCard(link.dataset.cardId, !!link.dataset.back);
+  }
+});
+
+quizOptions.addEventListener('click', (e) => {
+  const option = e.target.closest('[data-option]');
+  if (option) {
+    handleQuizAnswer(Number(option.dataset.option));
+  }
+});
+
+studyModeSelect.addEventListener('change', () => {
+  const wasLeitner = studyMode === 'leitner';
+  studyMode = studyModeSelect.value;
+  showTranslation = false;
+  quiz = null;
+  recall = null;
+  if (wasLeitner !== (studyMode === 'leitner')) {
+    // Leitner mode studies the due cards only; Python sends them while it is on.
+    postToPython({ kind: 'leitner', open: studyMode === 'leitner' });
+    filterAndShuffleCards();
+  }
+  renderCard();
+});
+
+knewBtn.addEventListener('click', () => handleLeitnerAnswer(true));
+missedBtn.addEventListener('click', () => handleLeitnerAnswer(false));
+
+cardOrderSelect.addEventListener('change', () => {
+  cardOrder = cardOrderSelect.value;
+  filterAndShuffleCards();
+  renderCard();
+});
+
+recallInput.addEventListener('keydown', (e) => {
+  // Keep Space and the arrows for typing; Enter scores, Shift+Enter is a newline.
+  e.stopPropagation();
+  if (e.key === 'Enter' && !e.shiftKey) {
+    e.preventDefault();
+    if (recall && recall.result) {
+      handleNextCard();
+      recallInput.focus();
+    } else {
+      handleRecallSubmit();
+    }
+  }
+});
+
+mixRatioInputs.forEach(input => {
+  input.addEventListener('change', () => {
+    if (selectedType === MIXED) {
+      filterAndShuffleCards();
+      renderCard();
+    }
+  });
+});
+
+cardTypeRadios.forEach(radio => {
+  radio.addEventListener('change', () => {
+    selectedType = radio.value;
+    filterAndShuffleCards();
+    renderCard();
+  });
+});
+
+function showDeck(cards) {
+  flashcardData = cards;
+  cardsById = new Map(cards.map(card => [card.id, card]));
+  const linkedCard = initialCardId && flashcardData.find(card => card.id === initialCardId);
+  initialCardId = '';
+  if (linkedCard) {
+    cardTypeRadios.forEach(radio => { radio.checked = radio.value === linkedCard.type; });
+    selectedType = linkedCard.type;
+  }
+  filterAndShuffleCards();
+  if (linkedCard) {
+    cardIndex = Math.max(0, filteredData.indexOf(linkedCard));
+  }
+  renderCard();
+}
+
+// Swap in a new version of the deck on screen without losing the learner's
+// place: the shuffled order is kept, edited cards are replaced where they
+// stand, deleted ones drop out and new ones join the end of the rotation.
+function refreshDeck(cards, hash) {
+  const previous = new Map(flashcardData.map(card => [card.id, card]));
+  const byId = new Map(cards.map(card => [card.id, card]));
+  const currentCard = filteredData[cardIndex];
+  let index = 0;
+  const kept = [];
+  filteredData.forEach((card, i) => {
+    const updated = byId.get(card.id);
+    if (updated) {
+      index += i < cardIndex ? 1 : 0;
+      kept.push(updated);
+    }
+  });
+  cards.forEach(card => {
+    if (!previous.has(card.id) && card.type === selectedType) {
+      kept.push(card);
+    }
+  });
+  // applyDelta keeps unchanged cards as the same objects.
+  const unchanged = new Set(cards.filter(card => previous.get(card.id) === card).map(card => card.id));
+  retainFragments(hash, unchanged);
+
+  if (selectedType === MIXED) {
+    // New cards join through fresh queues; the ones already shown wait for
+    // the next round of their type.
+    startMixedSession(cards, new Set(kept.map(card => card.id)));
+    const card = kept.length === 0 ? drawMixedCard() : null;
+    if (card) {
+      kept.push(card);
+    }
+  }
+
+  flashcardData = cards;
+  cardsById = byId;
+  filteredData = kept;
+  cardIndex = Math.min(index, Math.max(0, kept.length - 1));
+  if (!currentCard || !unchanged.has(currentCard.id) || filteredData[cardIndex] !== currentCard) {
+    showTranslation = false;
+  }
+  renderCard();
+}
+
+// Note the kind of input before the handlers below run (capture phase).
+document.addEventListener('keydown', () => { inputVia = 'key'; }, true);
+document.addEventListener('click', () => { inputVia = 'click'; }, true);
+window.addEventListener('pagehide', flushTimings);
+
+// Keyboard shortcuts
+window.addEventListener('keydown', (e) => {
+  if (e.code === 'Space') { e.preventDefault(); handleShowHide(); }
+  if (e.code === 'ArrowRight') { e.preventDefault(); handleNextCard(); }
+  if (rendered && rendered.question && /^Digit[1-4]$/.test(e.code)) { handleQuizAnswer(Number(e.code.slice(5)) - 1); }
+});
+
+// --- Streamlit component protocol ---------------------------------------------
+
+function sendToStreamlit(type, data) {
+  window.parent.postMessage({ isStreamlitMessage: true, type, ...data }, '*');
+}
+
+// Only the latest component value survives until the next rerun, so messages
+// to Python are queued with a sequence number and re-sent until acknowledged.
+const clientId = Math.random().toString(36).slice(2);
+let outbox = [];
+let nextSeq = 1;
+
+function postToPython(message) {
+  outbox.push({ ...message, seq: nextSeq++ });
+  sendToStreamlit('streamlit:setComponentValue', {
+    value: { client: clientId, messages: outbox },
+    dataType: 'json'
+  });
+}
+
+function acknowledge(ack) {
+  if (ack && ack.client === clientId) {
+    outbox = outbox.filter(message => message.seq > ack.seq);
+    if (timingCount >= TIMING_BATCH) {
+      flushTimings();
+    }
+  }
+}
+
+function updateFrameHeight() {
+  sendToStreamlit('streamlit:setFrameHeight', { height: document.body.scrollHeight });
+}
+
+// --- Deck cache (IndexedDB) -----------------------------------------------------
+//
+// Decks are stored by the content hash Python sends in the manifest, together
+// with the HTML fragments rendered for their cards, so a returning session
+// with the same hash needs neither a download nor any re-highlighting. Only
+// MAX_CACHED_DECKS versions are kept, least recently used evicted first.
+
+const DECK_DB = 'eiki-flashcards';
+const DECK_STORE = 'decks';
+const FRAGMENT_STORE = 'fragments';
+const MAX_CACHED_DECKS = 4;
+
+let deckDb = null;
+
+function idbRequest(request) {
+  return new Promise((resolve, reject) => {
+    request.onsuccess = () => resolve(request.result);
+    request.onerror = () => reject(request.error);
+  });
+}
+
+function idbTransaction(stores, mode, fn) {
+  return openDeckDb().then(db => new Promise((resolve, reject) => {
+    const tx = db.transaction(stores, mode);
+    const result = fn(tx);
+    tx.oncomplete = () => resolve(result);
+    tx.onerror = () => reject(tx.error);
+    tx.onabort = () => reject(tx.error);
+  }));
+}
+
+function openDeckDb() {
+  if (!deckDb) {
+    // Inside the executor so a missing indexedDB becomes a rejection.
+    deckDb = new Promise((resolve, reject) => {
+      const request = indexedDB.open(DECK_DB, 2);
+      request.onupgradeneeded = () => {
+        const db = request.result;
+        // Version 1 keyed decks by deckId; start over rather than migrate a cache.
+        Array.from(db.objectStoreNames).forEach(name => db.deleteObjectStore(name));
+        const decks = db.createObjectStore(DECK_STORE, { keyPath: 'hash' });
+        decks.createIndex('deckId', 'deckId');
+        decks.createIndex('lastUsed', 'lastUsed');
+        db.createObjectStore(FRAGMENT_STORE, { keyPath: 'hash' });
+      };
+      request.onsuccess = () => resolve(request.result);
+      request.onerror = () => reject(request.error);
+    });
+  }
+  return deckDb;
+}
+
+// Cached deck with exactly this content hash, or the newest cached version of
+// deckId to apply a delta to. Marks the returned record as recently used.
+async function loadCachedDeck(deckId, hash) {
+  try {
+    return await idbTransaction([DECK_STORE], 'readwrite', tx => {
+      const store = tx.objectStore(DECK_STORE);
+      const found = {};
+      idbRequest(store.get(hash)).then(exact => {
+        if (exact) {
+          found.record = exact;
+          exact.lastUsed = Date.now();
+          store.put(exact);
+          return;
+        }
+        idbRequest(store.index('deckId').getAll(deckId)).then(records => {
+          found.record = records.sort((a, b) => b.version - a.version)[0] || null;
+        });
+      });
+      return found;
+    }).then(found => found.record || null);
+  } catch (err) {
+    // No IndexedDB (e.g. private browsing): behave like an empty cache.
+    return null;
+  }
+}
+
+async function loadCachedFragments(hash) {
+  try {
+    const record = await idbTransaction([FRAGMENT_STORE], 'readonly',
+      tx => idbRequest(tx.objectStore(FRAGMENT_STORE).get(hash)));
+    return (await record) || null;
+  } catch (err) {
+    return null;
+  }
+}
+
+async function saveCachedDeck(record) {
+  try {
+    await idbTransaction([DECK_STORE, FRAGMENT_STORE], 'readwrite', tx => {
+      const decks = tx.objectStore(DECK_STORE);
+      decks.put({ ...record, lastUsed: Date.now() });
+      // Evict least recently used versions beyond the limit.
+      idbRequest(decks.index('lastUsed').getAllKeys()).then(hashes => {
+        hashes.slice(0, Math.max(0, hashes.length - MAX_CACHED_DECKS)).forEach(hash => {
+          decks.delete(hash);
+          tx.objectStore(FRAGMENT_STORE).delete(hash);
+        });
+      });
+    });
+  } catch (err) {
+    console.warn('Could not cache deck', err);
+  }
+}
+
+// --- Rendered fragments -----------------------------------------------------------
+
+let fragmentHash = null;
+let fragmentCache = new Map();
+let fragmentSaveTimer = null;
+
+function cachedFragment(card, kind, render) {
+  const key = `${card.id}:${kind}`;
+  let fragment = fragmentCache.get(key);
+  if (fragment === undefined) {
+    fragment = timed('highlight', render);
+    fragmentCache.set(key, fragment);
+    scheduleFragmentSave();
+  }
+  return fragment;
+}
+
+async function useFragmentsFor(hash) {
+  fragmentHash = hash;
+  const record = await loadCachedFragments(hash);
+  fragmentCache = new Map(record ? Object.entries(record.fragments) : []);
+}
+
+// Carry over the fragments of cards a new deck version left untouched.
+function retainFragments(hash, cardIds) {
+  fragmentHash = hash;
+  fragmentCache = new Map(Array.from(fragmentCache).filter(([key]) => cardIds.has(key.slice(0, key.indexOf(':')))));
+  scheduleFragmentSave();
+}
+
+function scheduleFragmentSave() {
+  if (fragmentSaveTimer || !fragmentHash) {
+    return;
+  }
+  // Batch writes: one put per few seconds of browsing, not one per card.
+  fragmentSaveTimer = setTimeout(() => {
+    fragmentSaveTimer = null;
+    const record = { hash: fragmentHash, fragments: Object.fromEntries(fragmentCache) };
+    idbTransaction([DECK_STORE, FRAGMENT_STORE], 'readwrite', tx => {
+      // Skip if the deck was evicted meanwhile.
+      idbRequest(tx.objectStore(DECK_STORE).getKey(record.hash)).then(key => {
+        if (key !== undefined) {
+          tx.objectStore(FRAGMENT_STORE).put(record);
+        }
+      });
+    }).catch(() => {});
+  }, 3000);
+}
+
+// --- Deck sync ------------------------------------------------------------------
+
+function applyDelta(cards, delta) {
+  const removed = new Set(delta.removed);
+  const modified = new Map(delta.modified.map(card => [card.id, card]));
+  return cards
+    .filter(card => !removed.has(card.id))
+    .map(card => modified.get(card.id) || card)
+    .concat(delta.added);
+}
+
+const ACCEPTED_ENCODINGS = typeof DecompressionStream === 'function' ? ['gzip'] : [];
+
+function toHex(buffer) {
+  return Array.from(new Uint8Array(buffer), b => b.toString(16).padStart(2, '0')).join('');
+}
+
+// Inflate a compressed payload (see flashcards/payload.py) after checking the
+// SHA-256 of the blob. crypto.subtle only exists in secure contexts, so plain
+// http skips the check.
+async function unpackPayload(payload, blob) {
+  if (!payload.encoding) {
+    return payload;
+  }
+  const started = performance.now();
+  const bytes = blob instanceof Uint8Array ? blob : new Uint8Array(blob);
+  if (window.crypto && crypto.subtle) {
+    const digest = toHex(await crypto.subtle.digest('SHA-256', bytes));
+    if (digest !== payload.sha256) {
+      throw new Error(`Deck payload failed its integrity check (${digest})`);
+    }
+  }
+  const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream(payload.encoding));
+  const body = JSON.parse(await new Response(stream).text());
+  console.info(`Deck payload: ${payload.size} B ${payload.encoding} -> ${payload.rawSize} B, ` +
+    `decoded in ${(performance.now() - started).toFixed(1)} ms`);
+  return { ...payload, ...body };
+}
+
+let localDeck = null;     // cached {hash, deckId, version, cards}
+let requestedVersion = null;
+// Encodings asked for in sync messages; dropped to inline JSON once a
+// compressed payload fails to unpack.
+let payloadEncodings = ACCEPTED_ENCODINGS;
+// Set when Python sent a delta from a version this page no longer holds.
+let wantFullDeck = false;
+let shownHash = null;
+let shownDeckId = null;
+
+async function onRender(args) {
+  acknowledge(args.ack);
+  setPerfReporting(!!args.perf);
+  setLeitnerEnabled(!!args.leitnerEnabled);
+  if (args.leitner) {
+    applyLeitnerWindow(args.leitner);
+  }
+  const manifest = args.deck;
+  if (deckTitle.innerText !== args.title) {
+    deckTitle.innerText = args.title;
+  }
+  if (args.initialCardId && shownHash === null) {
+    initialCardId = args.initialCardId;
+  }
+  if (!localDeck || localDeck.deckId !== manifest.id || localDeck.hash !== manifest.hash) {
+    const cached = await loadCachedDeck(manifest.id, manifest.hash);
+    if (cached && (cached.hash === manifest.hash || !localDeck || localDeck.deckId !== manifest.id)) {
+      localDeck = cached;
+    }
+  }
+
+  const isCurrent = localDeck && localDeck.hash === manifest.hash;
+  let payload = null;
+  let parseStarted = null;
+  if (args.payload && args.payload.to === manifest.version && !isCurrent) {
+    parseStarted = perfStart('parse');
+    try {
+      payload = await unpackPayload(args.payload, args.payloadBlob);
+    } catch (err) {
+      console.error(err);
+      performance.clearMarks('eiki:parse:start');
+      // Python memoises the blob, so the same bad bytes would come back on
+      // every tick: ask again, for plain JSON this time.
+      if (payloadEncodings.length) {
+        payloadEncodings = [];
+        requestedVersion = null;
+      }
+    }
+  }
+  if (payload) {
+    let cards = null;
+    if (payload.kind === 'full') {
+      cards = payload.cards;
+    } else if (localDeck && localDeck.version === payload.from) {
+      cards = applyDelta(localDeck.cards, payload);
+    }
+    perfEnd('parse', parseStarted);
+    if (cards) {
+      localDeck = { deckId: manifest.id, version: manifest.version, hash: manifest.hash, cards };
+      wantFullDeck = false;
+      await saveCachedDeck(localDeck);
+    } else if (!wantFullDeck) {
+      wantFullDeck = true;
+      requestedVersion = null;
+    }
+  }
+
+  if (localDeck && localDeck.hash === manifest.hash) {
+    if (shownHash !== localDeck.hash) {
+      shownHash = localDeck.hash;
+      if (shownDeckId === manifest.id) {
+        // The deck changed on the server while it was open.
+        refreshDeck(localDeck.cards, localDeck.hash);
+      } else {
+        shownDeckId = manifest.id;
+        await useFragmentsFor(localDeck.hash);
+        showDeck(localDeck.cards);
+      }
+      postToPython({
+        kind: 'synced',
+        deck: manifest.id,
+        version: localDeck.version,
+        hash: localDeck.hash,
+        encodings: payloadEncodings
+      });
+    }
+  } else if (requestedVersion !== manifest.version) {
+    // Tell Python what we hold; it answers with a delta or the full deck.
+    requestedVersion = manifest.version;
+    postToPython({
+      kind: 'sync',
+      deck: manifest.id,
+      version: localDeck && !wantFullDeck ? localDeck.version : null,
+      hash: localDeck && !wantFullDeck ? localDeck.hash : null,
+      encodings: payloadEncodings
+    });
+  }
+  updateFrameHeight();
+}
+
+let renderQueue = Promise.resolve();
+window.addEventListener('message', (event) => {
+  if (event.data && event.data.type === 'streamlit:render') {
+    const args = event.data.args;
+    renderQueue = renderQueue.then(() => onRender(args)).catch(err => console.error(err));
+  }
+});
+
+new ResizeObserver(updateFrameHeight).observe(document.body);
+sendToStreamlit('streamlit:componentReady', { apiVersion: 1 });
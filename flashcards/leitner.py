@@ -0,0 +1,287 @@
+"""
+Leitner boxes, a lighter alternative to full spaced repetition.
+
+Each card type has BOXES boxes. New cards go into the first box; "knew it"
+moves a card up one box (it stays in the last one) and "missed it" sends it
+back to the first. Box n is due every INTERVALS[n] days, so well-known cards
+come up less and less often.
+
+A box is a deque of card ids, persisted per user and deck under
+<directory>/<user>/<deck id>/:
+
+  <type>.<n>.ids   card ids, one per line, oldest first
+  state.json       {"deck": <deck hash>,
+                    "boxes": {type: [{"head": h, "size": s, "reviewed": day, "taken": [...]}, ...]}}
+
+`head` counts the lines already taken off the front of the file, so taking a
+card off a box rewrites the small state.json and putting one on appends a
+line: both O(1), whatever the box holds. Cards answered out of order are
+noted in `taken` and skipped when the head reaches them. A box file is
+compacted once more than half of it has been taken.
+
+Only the boxes due today are read, into memory, when a session starts. The
+deck's ids are only compared with the boxes when the deck hash changes, to
+put new cards into the first box.
+
+    python -m flashcards.leitner .leitner/eiki/data
+"""
+
+import argparse
+import datetime
+import json
+import os
+import re
+import threading
+from collections import deque
+
+BOXES = 5
+# Days between reviews of each box.
+INTERVALS = (1, 2, 4, 8, 16)
+# Box files shorter than this are never compacted.
+COMPACT_MIN = 256
+
+_UNSAFE = re.compile(r"[^\w.-]")
+
+
+def safe_name(name):
+    """`name` made safe as a file name (users and deck ids come from the URL)."""
+    name = _UNSAFE.sub("_", name or "")
+    # "", "." and ".." would name this directory or its parent.
+    return name if name.strip(".") else "_"
+
+
+def today():
+    return datetime.date.today().toordinal()
+
+
+class LeitnerBoxes:
+    """One user's boxes for one deck. Shared by that user's sessions, so it is locked."""
+
+    def __init__(self, directory, day=None):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self.state = self._read_state()
+        self._load_due(day or today())
+
+    # --- Files ---
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _box_file(self, card_type, box):
+        return self._path("{}.{}.ids".format(safe_name(card_type), box + 1))
+
+    def _read_state(self):
+        try:
+            with open(self._path("state.json"), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"deck": None, "boxes": {}}
+
+    def _write_state(self):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = self._path("state.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, separators=(",", ":"))
+        os.replace(tmp, self._path("state.json"))
+
+    def _read_box(self, card_type, box):
+        try:
+            with open(self._box_file(card_type, box), "r", encoding="utf-8") as f:
+                return f.read().split()
+        except OSError:
+            return []
+
+    def _append(self, card_type, box, card_ids):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._box_file(card_type, box), "a", encoding="utf-8") as f:
+            f.write("".join(card_id + "\n" for card_id in card_ids))
+        self._boxes(card_type)[box]["size"] += len(card_ids)
+
+    def _boxes(self, card_type):
+        boxes = self.state["boxes"].get(card_type)
+        if boxes is None:
+            # The first box is due at once; a card moved up today is due a
+            # full interval later.
+            boxes = self.state["boxes"][card_type] = [
+                {"head": 0, "size": 0, "reviewed": None if box == 0 else self.day, "taken": []}
+                for box in range(BOXES)
+            ]
+        return boxes
+
+    # --- Due boxes ---
+
+    def is_due(self, card_type, box, day):
+        reviewed = self._boxes(card_type)[box]["reviewed"]
+        return reviewed is None or day - reviewed >= INTERVALS[box]
+
+    def _load_due(self, day):
+        """Read the boxes due on `day`."""
+        self.day = day
+        # {(type, box): deque of the box's ids from its head}, plus the ids
+        # still due in each and those answered out of order.
+        self.due = {}
+        self.pending = {}
+        self.taken = {}
+        for card_type in self.state["boxes"]:
+            for box in range(BOXES):
+                if self.is_due(card_type, box, day):
+                    self._load_box(card_type, box)
+
+    def _load_box(self, card_type, box):
+        entry = self._boxes(card_type)[box]
+        queue = self.due[card_type, box] = deque(self._read_box(card_type, box)[entry["head"]:])
+        self.taken[card_type, box] = set(entry["taken"])
+        self.pending[card_type, box] = set(queue) - self.taken[card_type, box]
+        self._skip_taken(card_type, box)
+
+    def _skip_taken(self, card_type, box):
+        queue, taken = self.due[card_type, box], self.taken[card_type, box]
+        entry = self._boxes(card_type)[box]
+        while queue and queue[0] in taken:
+            taken.discard(queue.popleft())
+            entry["head"] += 1
+        entry["taken"] = sorted(taken)
+        if not queue:
+            entry["reviewed"] = self.day
+
+    def _roll_over(self):
+        if self.day != today():
+            self._load_due(today())
+
+    # --- Public API ---
+
+    def sync(self, deck_hash, cards):
+        """
+        Put cards the boxes have never seen into the first box, and take
+        cards no longer in the deck out of theirs. The boxes are only read
+        here when `deck_hash` differs from the last deck synced.
+        """
+        with self._lock:
+            if self.state.get("deck") == deck_hash:
+                return
+            ids_by_type = {}
+            for card in cards:
+                ids_by_type.setdefault(card.get("type"), []).append(card["id"])
+            for card_type in set(ids_by_type) | set(self.state["boxes"]):
+                card_ids = ids_by_type.get(card_type, [])
+                in_deck = set(card_ids)
+                boxed = set()
+                for box in range(BOXES):
+                    entry = self._boxes(card_type)[box]
+                    remaining = self._read_box(card_type, box)[entry["head"]:]
+                    # A taken id is in the box it moved to (or was deleted, and
+                    # goes back into the first box if it returns).
+                    untaken = set(remaining) - set(entry["taken"])
+                    boxed.update(untaken)
+                    gone = untaken - in_deck
+                    if gone:
+                        self._drop(card_type, box, gone)
+                new = [card_id for card_id in card_ids if card_id not in boxed]
+                if new:
+                    self._append(card_type, 0, new)
+                    if self.is_due(card_type, 0, self.day):
+                        self._load_box(card_type, 0)
+            self.state["deck"] = deck_hash
+            self._write_state()
+
+    def _drop(self, card_type, box, card_ids):
+        """
+        Treat deleted cards as taken off `box`, so nobody has to answer them
+        for the head to pass them (and the box to be reviewed).
+        """
+        if (card_type, box) in self.due:
+            self.pending[card_type, box] -= card_ids
+            self.taken[card_type, box] |= card_ids
+            self._skip_taken(card_type, box)
+        else:
+            entry = self._boxes(card_type)[box]
+            entry["taken"] = sorted(set(entry["taken"]) | card_ids)
+        self._compact(card_type, box)
+
+    def card_types(self):
+        with self._lock:
+            return sorted(self.state["boxes"])
+
+    def due_cards(self, card_type, limit=None, known=None):
+        """
+        [(card id, box)] due today for `card_type`, lowest box first, in
+        deque order; ids not in `known` (cards since deleted) are left out.
+        """
+        with self._lock:
+            self._roll_over()
+            found = []
+            for box in range(BOXES):
+                queue = self.due.get((card_type, box))
+                if not queue:
+                    continue
+                pending = self.pending[card_type, box]
+                for card_id in queue:
+                    if limit is not None and len(found) >= limit:
+                        return found
+                    if card_id in pending and (known is None or card_id in known):
+                        found.append((card_id, box))
+            return found
+
+    def due_count(self, card_type):
+        with self._lock:
+            return sum(len(pending) for key, pending in self.pending.items() if key[0] == card_type)
+
+    def answer(self, card_type, card_id, box, knew):
+        """
+        Move a due card out of `box`: up one box if the learner knew it, else
+        back to the first. Returns the new box, or None if the card was not
+        due there (e.g. a message re-sent after it was applied).
+        """
+        with self._lock:
+            pending = self.pending.get((card_type, box))
+            if not pending or card_id not in pending:
+                return None
+            pending.discard(card_id)
+            queue = self.due[card_type, box]
+            if queue[0] == card_id:
+                queue.popleft()
+                self._boxes(card_type)[box]["head"] += 1
+            else:
+                # Out of order: skipped when the head gets to it.
+                self.taken[card_type, box].add(card_id)
+            self._skip_taken(card_type, box)
+            target = min(box + 1, BOXES - 1) if knew else 0
+            self._append(card_type, target, [card_id])
+            self._compact(card_type, box)
+            self._write_state()
+            return target
+
+    def _compact(self, card_type, box):
+        """Rewrite a box file without the lines already taken once they are most of it."""
+        entry = self._boxes(card_type)[box]
+        if entry["size"] < COMPACT_MIN or entry["head"] * 2 <= entry["size"]:
+            return
+        remaining = self._read_box(card_type, box)[entry["head"]:]
+        tmp = self._box_file(card_type, box) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write("".join(card_id + "\n" for card_id in remaining))
+        os.replace(tmp, self._box_file(card_type, box))
+        entry["head"], entry["size"] = 0, len(remaining)
+
+    def counts(self):
+        """{type: [cards in each box]} (box sizes, including cards since deleted from the deck)."""
+        with self._lock:
+            return {
+                card_type: [entry["size"] - entry["head"] - len(entry["taken"]) for entry in boxes]
+                for card_type, boxes in self.state["boxes"].items()
+            }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Show a user's Leitner boxes for one deck.")
+    parser.add_argument("directory", help="the boxes' directory, e.g. .leitner/<user>/<deck id>")
+    args = parser.parse_args(argv)
+    boxes = LeitnerBoxes(args.directory)
+    for card_type, counts in sorted(boxes.counts().items()):
+        print("{:<16} {}  ({} due today)".format(
+            card_type, "  ".join("{:>5}".format(count) for count in counts), boxes.due_count(card_type)))
+
+
+if __name__ == "__main__":
+    main()
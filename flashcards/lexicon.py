@@ -0,0 +1,150 @@
+"""
+Versioned lexicons (phrasal verb translations, advanced vocab synonyms,
+verb inflections).
+
+Each lexicon lives in lexicons/<name>.json as
+{"name": ..., "version": N, "entries": {term: value}}. Lookups are
+case-insensitive, matching how the page used to index the JS literals.
+"""
+
+import json
+import os
+
+LEXICON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lexicons")
+
+PHRASAL_VERB_TRANSLATIONS = "phrasal_verb_translations"
+ADVANCED_VOCAB_SYNONYMS = "advanced_vocab_synonyms"
+VERB_INFLECTIONS = "verb_inflections"
+
+
+class Lexicon:
+    """An in-memory index over one lexicon data file."""
+
+    def __init__(self, name, version, entries):
+        self.name = name
+        self.version = version
+        # Later duplicates win, same as a JS object literal.
+        self.entries = {term.lower(): value for term, value in entries.items()}
+
+    @classmethod
+    def load(cls, name, directory=LEXICON_DIR):
+        path = os.path.join(directory, name + ".json")
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data.get("name", name), data.get("version", 0), data.get("entries", {}))
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, term):
+        return term.lower() in self.entries
+
+    def get(self, term, default=None):
+        return self.entries.get(term.lower(), default)
+
+    def select(self, terms):
+        """
+        Return the subset of entries referenced by `terms`, keyed by the
+        lower-cased term. Unknown terms are skipped.
+        """
+        selected = {}
+        for term in terms:
+            key = term.lower()
+            if key in self.entries:
+                selected[key] = self.entries[key]
+        return selected
+
+
+def load_lexicons(directory=LEXICON_DIR):
+    """Load every lexicon the page needs, keyed by lexicon name."""
+    return {
+        name: Lexicon.load(name, directory)
+        for name in (PHRASAL_VERB_TRANSLATIONS, ADVANCED_VOCAB_SYNONYMS, VERB_INFLECTIONS)
+    }
+
+
+def _vocab_word(vocab):
+    # advancedVocab items are {"word", "translation"} but plain strings are accepted too.
+    return vocab.get("word", "") if isinstance(vocab, dict) else vocab
+
+
+def attach_card_lexicons(card, lexicons):
+    """
+    Return `card` with only the lexicon entries its own phrasalVerbs /
+    advancedVocab refer to, if it is an IELTS card:
+
+      phrasalVerbTranslations: {"passed down": "传承", ...}
+      vocabSynonyms: {"heritage": [{"word": ..., "translation": ...}], ...}
+
+    Other card types are returned unchanged (not copied).
+    """
+    if card.get("type") != "ielts_questions":
+        return card
+    card = dict(card)
+    pv_translations = lexicons[PHRASAL_VERB_TRANSLATIONS].select(card.get("phrasalVerbs") or [])
+    vocab_synonyms = lexicons[ADVANCED_VOCAB_SYNONYMS].select(
+        _vocab_word(v) for v in card.get("advancedVocab") or [])
+    if pv_translations:
+        card["phrasalVerbTranslations"] = pv_translations
+    if vocab_synonyms:
+        card["vocabSynonyms"] = vocab_synonyms
+    return card
+
+
+def attach_lexicons(cards, lexicons):
+    """attach_card_lexicons() over a list of cards."""
+    return [attach_card_lexicons(card, lexicons) for card in cards]
+
+
+def _doubles_final_consonant(verb):
+    # stop -> stopped, but open -> opened: only one-syllable verbs ending consonant-vowel-consonant.
+    return (len(verb) >= 3 and verb[-1] not in "aeiouwxy" and verb[-2] in "aeiou"
+            and verb[-3] not in "aeiou" and not any(ch in "aeiou" for ch in verb[:-3]))
+
+
+def verb_forms(verb, inflections):
+    """
+    Inflected forms of `verb`, base form first: the entry in the
+    verb_inflections lexicon if there is one, else regular spelling rules.
+    """
+    verb = verb.lower()
+    listed = inflections.get(verb)
+    if listed:
+        return list(dict.fromkeys(listed))
+    consonant_y = verb.endswith("y") and verb[-2:-1] not in ("", "a", "e", "i", "o", "u")
+    if verb.endswith(("s", "sh", "ch", "x", "z", "o")):
+        third = verb + "es"
+    elif consonant_y:
+        third = verb[:-1] + "ies"
+    else:
+        third = verb + "s"
+    if verb.endswith("e"):
+        past, ing = verb + "d", (verb if verb.endswith("ee") else verb[:-1]) + "ing"
+    elif consonant_y:
+        past, ing = verb[:-1] + "ied", verb + "ing"
+    elif _doubles_final_consonant(verb):
+        past, ing = verb + verb[-1] + "ed", verb + verb[-1] + "ing"
+    else:
+        past, ing = verb + "ed", verb + "ing"
+    return list(dict.fromkeys([verb, third, past, ing]))
+
+
+def attach_verb_forms(card, lexicons):
+    """
+    Return a phrasal_verbs card with the inflected forms of the verbs in its
+    phrasalVerbs, keyed by base verb:
+
+      phrasalVerbForms: {"put": ["put", "puts", "putting"]}
+
+    The page uses them to highlight the phrasal verbs and to give credit for
+    them in typed answers, whatever form they appear in. Other card types are
+    returned unchanged (not copied).
+    """
+    if card.get("type") != "phrasal_verbs":
+        return card
+    forms = {}
+    for pv in card.get("phrasalVerbs") or []:
+        words = ((pv.get("english") if isinstance(pv, dict) else pv) or "").lower().split()
+        if len(words) >= 2 and words[0] not in forms:
+            forms[words[0]] = verb_forms(words[0], lexicons[VERB_INFLECTIONS])
+    return dict(card, phrasalVerbForms=forms) if forms else card
@@ -0,0 +1,362 @@
+"""
+Process-wide counters and histograms in the Prometheus text format.
+
+Nothing here needs a Prometheus client library or a running server: the
+registry renders its metrics as text, and the app either writes that text
+to a file every few seconds (for node_exporter's textfile collector, or
+anything that tails a file) or serves it on a local port at /metrics.
+
+  EIKI_METRICS_FILE=/var/lib/node_exporter/eiki.prom
+  EIKI_METRICS_PORT=9464
+
+Metrics are recorded whether or not they are exported; recording is a dict
+update under a lock. Values that other objects already count (the deck
+registry's cache hits, the build cache's) are read through callbacks when
+the text is rendered, so those modules know nothing of metrics.
+"""
+
+import bisect
+import contextlib
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# Seconds between writes of the metrics file.
+WRITE_INTERVAL = 15.0
+# A session counts as active if its page ticked within this many seconds.
+ACTIVE_WINDOW = 60.0
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+BYTES_BUCKETS = (1 << 10, 4 << 10, 16 << 10, 64 << 10, 256 << 10, 1 << 20, 4 << 20, 16 << 20)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join('{}="{}"'.format(name, _escape(value)) for name, value in pairs) + "}"
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+
+    kind = "untyped"
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError("{} takes labels {}, got {}".format(self.name, self.labelnames, sorted(labels)))
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self):
+        return ["# HELP {} {}".format(self.name, self.help.replace("\\", "\\\\").replace("\n", "\\n")),
+                "# TYPE {} {}".format(self.name, self.kind)]
+
+
+class Counter(_Metric):
+    """A value that only goes up, e.g. reruns or bytes sent."""
+
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError("counters only go up")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def lines(self):
+        with self._lock:
+            values = dict(self._values)
+        if not values and not self.labelnames:
+            values[()] = 0
+        return ["{}{} {}".format(self.name, _labels(self.labelnames, key), _number(value))
+                for key, value in sorted(values.items())]
+
+
+class Gauge(Counter):
+    """A value that goes up and down, e.g. active sessions."""
+
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative `le` buckets, with their sum and count."""
+
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=SECONDS_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0, 0]
+            # Counted in the first bucket it fits; made cumulative when rendered.
+            entry[0][bisect.bisect_left(self.buckets, value)] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextlib.contextmanager
+    def time(self, **labels):
+        """Observe the wall time of the `with` block, in seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def lines(self):
+        with self._lock:
+            values = {key: (list(counts), total, count) for key, (counts, total, count) in self._values.items()}
+        lines = []
+        for key, (counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket
+                lines.append("{}_bucket{} {}".format(
+                    self.name, _labels(self.labelnames, key, [("le", _number(float(bound)))]), cumulative))
+            lines.append("{}_sum{} {}".format(self.name, _labels(self.labelnames, key), _number(total)))
+            lines.append("{}_count{} {}".format(self.name, _labels(self.labelnames, key), count))
+        return lines
+
+
+class _Callback(_Metric):
+    """A counter or gauge whose value is read from `read()` at render time."""
+
+    def __init__(self, name, help, kind, read, labelnames=()):
+        super().__init__(name, help, labelnames)
+        self.kind = kind
+        self.read = read
+
+    def lines(self):
+        try:
+            values = self.read()
+        except Exception:
+            logger.exception("Reading metric %s failed", self.name)
+            return []
+        if not isinstance(values, dict):
+            values = {(): values}
+        return ["{}{} {}".format(self.name, _labels(self.labelnames, key if isinstance(key, tuple) else (key,)),
+                                 _number(value))
+                for key, value in sorted(values.items())]
+
+
+class MetricsRegistry:
+    """Named metrics of one process, rendered together in the text format."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _add(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError("metric {} is already registered".format(metric.name))
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self._add(Counter(name, help, labelnames))
+
+    def gauge(self, name, help, labelnames=()):
+        return self._add(Gauge(name, help, labelnames))
+
+    def histogram(self, name, help, labelnames=(), buckets=SECONDS_BUCKETS):
+        return self._add(Histogram(name, help, labelnames, buckets))
+
+    def counter_function(self, name, help, read, labelnames=()):
+        """
+        A counter whose value `read()` returns: a number, or {label values
+        (a tuple, or one value for one label): number}.
+        """
+        return self._add(_Callback(name, help, "counter", read, labelnames))
+
+    def gauge_function(self, name, help, read, labelnames=()):
+        return self._add(_Callback(name, help, "gauge", read, labelnames))
+
+    def render(self):
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.header())
+            lines.extend(metric.lines())
+        return "\n".join(lines) + "\n"
+
+    # --- Export ---
+
+    def write(self, path):
+        """Write the text to `path` atomically, so a collector never reads half a file."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+    def start_writer(self, path, interval=WRITE_INTERVAL):
+        """Rewrite `path` every `interval` seconds from a daemon thread."""
+        def run():
+            while True:
+                try:
+                    self.write(path)
+                except OSError:
+                    logger.exception("Writing metrics to %s failed", path)
+                time.sleep(interval)
+
+        thread = threading.Thread(target=run, name="metrics-writer", daemon=True)
+        thread.start()
+        return thread
+
+    def serve(self, port, host="127.0.0.1"):
+        """Serve the text at http://host:port/metrics from a daemon thread; returns the server."""
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        thread = threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True)
+        thread.start()
+        return server
+
+
+class ActiveSessions:
+    """Sessions seen within the last `window` seconds."""
+
+    def __init__(self, window=ACTIVE_WINDOW):
+        self.window = window
+        self._seen = {}
+        self._lock = threading.Lock()
+        self.started = 0
+
+    def touch(self, session_id):
+        now = time.monotonic()
+        with self._lock:
+            if session_id not in self._seen:
+                self.started += 1
+            self._seen[session_id] = now
+
+    def count(self):
+        cutoff = time.monotonic() - self.window
+        with self._lock:
+            for session_id in [s for s, seen in self._seen.items() if seen < cutoff]:
+                del self._seen[session_id]
+            return len(self._seen)
+
+
+class AppMetrics:
+    """The flashcard app's metrics, on one registry."""
+
+    def __init__(self, registry=None, active_window=ACTIVE_WINDOW):
+        r = self.registry = registry or MetricsRegistry()
+        self.reruns = r.counter(
+            "eiki_reruns_total",
+            "Streamlit script reruns and flashcard fragment runs (a full rerun also runs the fragment).",
+            ("kind",))
+        self.rerun_seconds = r.histogram(
+            "eiki_rerun_seconds", "Wall time of script reruns and fragment runs.", ("kind",))
+        self.deck_build_seconds = r.histogram(
+            "eiki_deck_build_seconds", "Time to load and build a deck version, including hot reloads.", ("deck",))
+        self.payload_bytes = r.histogram(
+            "eiki_payload_bytes", "Bytes of each deck payload sent to a page (gzip blob or inline JSON).",
+            ("kind", "encoding"), buckets=BYTES_BUCKETS)
+        self.card_bytes = r.counter(
+            "eiki_payload_card_bytes_total", "Uncompressed JSON bytes of the cards sent to pages, by card type.",
+            ("type",))
+        self.sessions = ActiveSessions(active_window)
+        r.gauge_function(
+            "eiki_active_sessions", "Sessions whose page ran within the last {:g} seconds.".format(active_window),
+            self.sessions.count)
+        r.counter_function(
+            "eiki_sessions_total", "Sessions started since the process started.", lambda: self.sessions.started)
+
+    @contextlib.contextmanager
+    def rerun(self, kind):
+        """Count and time one rerun of `kind` ("script" or "fragment")."""
+        self.reruns.inc(kind=kind)
+        with self.rerun_seconds.time(kind=kind):
+            yield
+
+    def payload_sent(self, header, blob, card_bytes):
+        """Record a payload sent to a page; `card_bytes` is {card type: raw JSON bytes}."""
+        if header is None:
+            return
+        # Inline payloads are (almost all) the cards' JSON.
+        size = len(blob) if blob is not None else sum(card_bytes.values())
+        self.payload_bytes.observe(size, kind=header.get("kind", ""), encoding=header.get("encoding", "json"))
+        for card_type, size in card_bytes.items():
+            self.card_bytes.inc(size, type=card_type)
+
+    def watch_caches(self, deck_registry, build_cache):
+        """Export the deck registry's and the build cache's hit and miss counts."""
+        self.registry.counter_function(
+            "eiki_cache_hits_total", "Lookups answered from a cache.",
+            lambda: {"deck": deck_registry.hits, "build": build_cache.hits}, ("cache",))
+        self.registry.counter_function(
+            "eiki_cache_misses_total", "Lookups a cache could not answer (a deck or card was built).",
+            lambda: {"deck": deck_registry.misses, "build": build_cache.misses}, ("cache",))
+        self.registry.counter_function(
+            "eiki_deck_evictions_total", "Decks dropped from the registry to stay within its memory budget.",
+            lambda: deck_registry.evictions)
+        self.registry.gauge_function(
+            "eiki_deck_cache_bytes", "Approximate bytes held by cached decks.",
+            lambda: deck_registry.stats()["bytes"])
+
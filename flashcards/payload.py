@@ -0,0 +1,148 @@
+"""
+Compressed deck payloads.
+
+Deck contents are sent to the page as a gzip blob (a bytes component arg,
+so it is not base64'd) with a SHA-256 of the compressed bytes for integrity.
+The page inflates it with the native DecompressionStream. Browsers without
+DecompressionStream say so in their sync message and get plain JSON.
+
+Brotli compresses this deck a little better, but DecompressionStream only
+does gzip/deflate, so brotli appears in the report for comparison only
+(and only if the optional `brotli` package is installed).
+
+    python -m flashcards.payload data.json
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import time
+from collections import defaultdict
+
+try:
+    import brotli
+except ImportError:  # optional, report only
+    brotli = None
+
+ENCODING = "gzip"
+
+# Downlink speeds used to turn byte counts into transfer time in the report.
+CONNECTIONS = {"3G": 1.6e6, "4G": 9e6}
+
+
+def _card_json(obj):
+    # Compact cards (flashcards.cards) are expanded only while encoding.
+    if hasattr(obj, "to_json"):
+        return obj.to_json()
+    raise TypeError("Object of type {} is not JSON serializable".format(type(obj).__name__))
+
+
+def encode_json(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_card_json).encode("utf-8")
+
+
+def compress(obj):
+    """
+    Return (meta, blob): the gzip'd JSON of `obj` and
+    {"encoding", "sha256", "size", "rawSize"} describing it.
+    """
+    raw = encode_json(obj)
+    # mtime=0 keeps the blob (and its hash) identical across builds.
+    blob = gzip.compress(raw, compresslevel=9, mtime=0)
+    meta = {
+        "encoding": ENCODING,
+        "sha256": hashlib.sha256(blob).hexdigest(),
+        "size": len(blob),
+        "rawSize": len(raw),
+    }
+    return meta, blob
+
+
+def pack_payload(payload, encodings):
+    """
+    Split a sync payload into (header, blob). The header keeps kind/from/to;
+    the card data goes into the blob if the page accepts gzip, otherwise it
+    stays inline and blob is None.
+    """
+    if payload is None:
+        return None, None
+    if ENCODING not in (encodings or ()):
+        # Component args are serialised by Streamlit, which knows nothing of compact cards.
+        return json.loads(encode_json(payload)), None
+    header = {key: payload[key] for key in ("kind", "from", "to") if key in payload}
+    body = {key: value for key, value in payload.items() if key not in header}
+    meta, blob = compress(body)
+    header.update(meta)
+    return header, blob
+
+
+def bytes_by_type(payload):
+    """{card type: bytes of its cards' JSON} over the cards a sync payload carries."""
+    groups = defaultdict(list)
+    for key in ("cards", "added", "modified"):
+        for card in (payload or {}).get(key) or ():
+            groups[card.get("type", "?")].append(card)
+    return {card_type: len(encode_json(group)) for card_type, group in groups.items()}
+
+
+# --- Report -------------------------------------------------------------------
+
+def _decode_ms(blob, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        json.loads(gzip.decompress(blob))
+    return (time.perf_counter() - start) * 1000 / repeat
+
+
+def size_report(cards):
+    """Raw vs compressed size and decode time per card type (plus "all")."""
+    groups = defaultdict(list)
+    for card in cards:
+        groups[card.get("type", "?")].append(card)
+    groups["all"] = list(cards)
+    rows = []
+    for card_type, group in groups.items():
+        meta, blob = compress(group)
+        row = {
+            "type": card_type,
+            "cards": len(group),
+            "raw": meta["rawSize"],
+            "gzip": meta["size"],
+            "brotli": len(brotli.compress(encode_json(group))) if brotli else None,
+            "decode_ms": _decode_ms(blob),
+        }
+        for name, bits_per_second in CONNECTIONS.items():
+            row["saved_ms_" + name] = (meta["rawSize"] - meta["size"]) * 8 / bits_per_second * 1000
+        rows.append(row)
+    return rows
+
+
+def format_report(rows):
+    header = "{:<16} {:>6} {:>10} {:>10} {:>10} {:>9}".format(
+        "type", "cards", "raw B", "gzip B", "brotli B", "decode ms")
+    header += "".join(" {:>13}".format("saved ms " + name) for name in CONNECTIONS)
+    lines = [header]
+    for row in rows:
+        line = "{:<16} {:>6} {:>10} {:>10} {:>10} {:>9.2f}".format(
+            row["type"], row["cards"], row["raw"], row["gzip"],
+            row["brotli"] if row["brotli"] is not None else "-", row["decode_ms"])
+        line += "".join(" {:>13.0f}".format(row["saved_ms_" + name]) for name in CONNECTIONS)
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    from flashcards.build import build_deck
+    from flashcards.deck import assign_card_ids, read_deck_file
+    from flashcards.lexicon import load_lexicons
+
+    parser = argparse.ArgumentParser(description="Report compressed deck payload sizes per card type.")
+    parser.add_argument("deck", help="data.json or .jsonl deck")
+    args = parser.parse_args(argv)
+    cards = build_deck(assign_card_ids(read_deck_file(args.deck)), load_lexicons())
+    print(format_report(size_report(cards)))
+
+
+if __name__ == "__main__":
+    main()
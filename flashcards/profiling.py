@@ -0,0 +1,147 @@
+"""
+Opt-in timing of the Streamlit script, for catching regressions as decks grow.
+
+Off unless EIKI_PROFILE is set:
+
+  EIKI_PROFILE=1             wall time of each phase of every rerun
+  EIKI_PROFILE=cprofile      the same, plus cProfile stats for every rerun,
+                             written to EIKI_PROFILE_DIR (default .profiles/)
+
+The script wraps each rerun in profiler.run() and each phase in
+profiler.phase("name"). The last SAMPLES timings of every phase are kept,
+across reruns and sessions, for the debug table (table()). A fragment
+rerun counts as a run of its own; when the fragment runs inside a full
+rerun, its phases are part of that run.
+
+Dumps are ordinary pstats files:
+
+    python -m pstats .profiles/run-20250101-120000-1.prof
+"""
+
+import cProfile
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+SAMPLES = 200
+# cProfile dumps kept on disk; older ones are deleted.
+KEEP_DUMPS = 50
+
+
+class _Run:
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.started = time.perf_counter()
+        self.phases = []
+
+
+class Profiler:
+    """Phase timings aggregated over reruns. Shared by all sessions."""
+
+    def __init__(self, enabled=False, dump_dir=None, samples=SAMPLES):
+        self.enabled = enabled
+        self.dump_dir = dump_dir
+        self.samples = samples
+        self.timings = {}
+        self.runs = 0
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._dumps = deque()
+        self._dump_numbers = itertools.count(1)
+
+    @classmethod
+    def from_env(cls, default_dump_dir):
+        mode = os.environ.get("EIKI_PROFILE", "").strip().lower()
+        dump_dir = None
+        if mode == "cprofile":
+            dump_dir = os.environ.get("EIKI_PROFILE_DIR") or default_dump_dir
+        return cls(enabled=mode not in ("", "0", "false", "no"), dump_dir=dump_dir)
+
+    @contextmanager
+    def run(self, kind):
+        """Time one rerun (kind is "script" or "fragment"); nested runs join the outer one."""
+        if not self.enabled or getattr(self._local, "run", None) is not None:
+            yield
+            return
+        run = self._local.run = _Run(kind)
+        profile = self._start_profile()
+        try:
+            yield
+        finally:
+            self._local.run = None
+            if profile:
+                profile.disable()
+                self._dump(profile)
+            self._record(run.kind, time.perf_counter() - run.started)
+            for name, seconds in run.phases:
+                self._record(name, seconds)
+            with self._lock:
+                self.runs += 1
+
+    def phase(self, name):
+        """Context manager timing one phase of the current run (a no-op when profiling is off)."""
+        if not self.enabled or getattr(self._local, "run", None) is None:
+            return nullcontext()
+        return self._phase(name)
+
+    @contextmanager
+    def _phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._local.run.phases.append((name, time.perf_counter() - started))
+
+    def _record(self, name, seconds):
+        with self._lock:
+            samples = self.timings.get(name)
+            if samples is None:
+                samples = self.timings[name] = deque(maxlen=self.samples)
+            samples.append(seconds)
+
+    def _start_profile(self):
+        if not self.dump_dir:
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Only one profiler can be active per process; a concurrent
+            # session's run is timed but not profiled.
+            return None
+        return profile
+
+    def _dump(self, profile):
+        os.makedirs(self.dump_dir, exist_ok=True)
+        path = os.path.join(self.dump_dir, "run-{}-{}.prof".format(
+            time.strftime("%Y%m%d-%H%M%S"), next(self._dump_numbers)))
+        profile.dump_stats(path)
+        with self._lock:
+            self._dumps.append(path)
+            stale = [self._dumps.popleft() for _ in range(max(0, len(self._dumps) - KEEP_DUMPS))]
+        for old in stale:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+    def table(self):
+        """One row per phase: samples, mean, median, p95 and max in ms, slowest mean first."""
+        with self._lock:
+            timings = {name: sorted(samples) for name, samples in self.timings.items()}
+        rows = []
+        for name, values in timings.items():
+            rows.append({
+                "phase": name,
+                "samples": len(values),
+                "mean ms": round(1000 * sum(values) / len(values), 2),
+                "p50 ms": round(1000 * values[len(values) // 2], 2),
+                "p95 ms": round(1000 * values[min(len(values) - 1, len(values) * 95 // 100)], 2),
+                "max ms": round(1000 * values[-1], 2),
+            })
+        rows.sort(key=lambda row: -row["mean ms"])
+        return rows
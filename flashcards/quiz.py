@@ -0,0 +1,146 @@
+"""
+Wrong options for the multiple-choice quiz.
+
+Quiz mode shows a card's Chinese with four English options. The three wrong
+ones are the cards whose English reads most like the right answer: cosine
+similarity of TF-IDF vectors over character trigrams. Candidates come from
+cards of the same type and category (verbGroup for phrasal verbs), topped up
+from the rest of the type when the category is too small.
+
+Distractors are computed once per deck version, here with NumPy, and stored
+on each card as `distractors` (card ids). The page only looks them up.
+
+Trigrams are hashed into DIMENSIONS buckets, which keeps the matrices a fixed
+width whatever the vocabulary. Similarities are computed a block of cards at
+a time. Groups bigger than MAX_CANDIDATES are compared against a fixed sample
+of that size, so a deck's cost grows linearly with its size.
+"""
+
+import numpy as np
+
+from flashcards.cards import with_field
+
+QUIZ_TYPES = ("sentence", "vocabulary", "phrasal_verbs")
+DISTRACTORS = 3
+
+_BITS = 10
+DIMENSIONS = 1 << _BITS
+MAX_CANDIDATES = 4000
+BLOCK = 512
+# Ranked candidates kept per card, so duplicates of the answer can be skipped.
+_SHORTLIST = DISTRACTORS + 5
+
+_BASE = np.uint64(0x110000)  # one past the last code point
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def option_text(card):
+    """The English shown as a quiz option (vocabulary cards list several renderings)."""
+    english = card.get("english") or ""
+    return " / ".join(english) if isinstance(english, (list, tuple)) else english
+
+
+def _group_key(card):
+    return card.get("category") or card.get("verbGroup")
+
+
+def _term_counts(texts):
+    """Hashed character-trigram counts, one float32 row per text."""
+    matrix = np.zeros((len(texts), DIMENSIONS), dtype=np.float32)
+    if not texts:
+        return matrix
+    # One pass over all texts: NUL separates them, spaces pad the edges.
+    joined = "\0".join(" {} ".format(text.lower()) for text in texts)
+    codes = np.frombuffer(joined.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+    doc = np.cumsum(codes == 0)[:-2]
+    first, middle, last = codes[:-2], codes[1:-1], codes[2:]
+    valid = (first != 0) & (middle != 0) & (last != 0)
+    grams = (first[valid] * _BASE + middle[valid]) * _BASE + last[valid]
+    buckets = (grams * _MIX) >> np.uint64(64 - _BITS)
+    np.add.at(matrix, (doc[valid], buckets.astype(np.intp)), 1)
+    return matrix
+
+
+def _normalise(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def _rank(texts, queries, pool):
+    """
+    For each index in `queries`, indices from `pool` (into `texts`) in order of
+    similarity, best first, excluding the query itself.
+    """
+    pool = np.asarray(pool)
+    if len(pool) > MAX_CANDIDATES:
+        sample = np.random.default_rng(len(pool)).choice(len(pool), MAX_CANDIDATES, replace=False)
+        pool = pool[np.sort(sample)]
+    counts = _term_counts([texts[i] for i in pool])
+    idf = np.log((1 + len(pool)) / (1 + np.count_nonzero(counts, axis=0))).astype(np.float32) + 1
+    candidates = _normalise(counts * idf)
+    keep = min(_SHORTLIST + 1, len(pool))
+    ranked = {}
+    for start in range(0, len(queries), BLOCK):
+        block = queries[start:start + BLOCK]
+        similarity = _normalise(_term_counts([texts[i] for i in block]) * idf) @ candidates.T
+        similarity[np.asarray(block)[:, None] == pool[None, :]] = -np.inf
+        if keep < len(pool):
+            top = np.argpartition(-similarity, keep - 1, axis=1)[:, :keep]
+        else:
+            top = np.tile(np.arange(len(pool)), (len(block), 1))
+        for row, query in enumerate(block):
+            # Ties go to the earlier card, so the result does not depend on argpartition.
+            order = sorted(top[row], key=lambda col: (-similarity[row, col], col))
+            ranked[query] = [int(pool[col]) for col in order if similarity[row, col] > -np.inf]
+    return ranked
+
+
+def nearest_distractors(cards, count=DISTRACTORS):
+    """{card id: tuple of up to `count` card ids} for every quiz-able card."""
+    texts = [option_text(card) for card in cards]
+    by_type = {}
+    for i, card in enumerate(cards):
+        if card.get("type") in QUIZ_TYPES and texts[i]:
+            by_type.setdefault(card["type"], []).append(i)
+
+    chosen = {}
+    for members in by_type.values():
+        groups = {}
+        for i in members:
+            groups.setdefault(_group_key(cards[i]), []).append(i)
+        picks = {i: [] for i in members}
+        for group in groups.values():
+            if len(group) > count:
+                _pick(picks, _rank(texts, group, group), texts, count)
+        short = [i for i in members if len(picks[i]) < count]
+        if short:
+            _pick(picks, _rank(texts, short, members), texts, count)
+        for i, picked in picks.items():
+            chosen[cards[i]["id"]] = tuple(cards[j]["id"] for j in picked)
+    return chosen
+
+
+def _pick(picks, ranked, texts, count):
+    """Add ranked candidates to `picks` until each has `count`, skipping repeated option texts."""
+    for query, candidates in ranked.items():
+        picked = picks[query]
+        seen = {texts[query]} | {texts[j] for j in picked}
+        for j in candidates:
+            if len(picked) >= count:
+                break
+            if texts[j] not in seen:
+                picked.append(j)
+                seen.add(texts[j])
+
+
+def attach_distractors(cards, count=DISTRACTORS):
+    """
+    Return `cards` with `distractors` set on every quiz-able card. Cards whose
+    distractors did not change are returned as the same objects, so the deck
+    snapshot can tell they are unchanged.
+    """
+    distractors = nearest_distractors(cards, count)
+    return [
+        with_field(card, "distractors", list(distractors[card["id"]])) if card["id"] in distractors else card
+        for card in cards
+    ]
@@ -0,0 +1,116 @@
+"""
+A process-wide LRU of built decks, bounded by memory footprint.
+
+Every Streamlit session asks the registry for its deck. Each deck is built
+once per change token and shared. When the summed footprint of the cached
+decks (cards, indexes and packed payloads) goes over the budget, the least
+recently used decks are dropped. The newest deck is always kept, even if it
+alone is over the budget.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def deep_sizeof(obj, _seen=None):
+    """Approximate bytes held by `obj` and everything it references (dicts, lists, strings...)."""
+    seen = _seen if _seen is not None else set()
+    stack = [obj]
+    total = 0
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        total += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            stack.extend(item)
+        elif hasattr(item, "__dict__"):
+            stack.append(vars(item))
+        else:
+            for cls in type(item).__mro__:
+                slots = cls.__dict__.get("__slots__", ())
+                stack.extend(getattr(item, slot) for slot in ((slots,) if isinstance(slots, str) else slots)
+                             if hasattr(item, slot))
+    return total
+
+
+class DeckRegistry:
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # deck_id -> (change_token, snapshot)
+        self._lock = threading.Lock()
+        self._build_locks = {}
+        self.evictions = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, deck_id, change_token, build):
+        """
+        Return the cached snapshot for `deck_id` at `change_token`, calling
+        build() to make one if needed. Concurrent sessions asking for the
+        same deck wait for a single build.
+        """
+        snapshot = self._lookup(deck_id, change_token)
+        if snapshot is not None:
+            return snapshot
+        with self._lock:
+            build_lock = self._build_locks.setdefault(deck_id, threading.Lock())
+        with build_lock:
+            snapshot = self._lookup(deck_id, change_token)
+            if snapshot is None:
+                snapshot = build()
+                with self._lock:
+                    self.misses += 1
+                    self._entries[deck_id] = (change_token, snapshot)
+                    self._entries.move_to_end(deck_id)
+                    self._evict()
+        return snapshot
+
+    def peek(self, deck_id):
+        """The cached snapshot for `deck_id` at whatever change token, or None."""
+        with self._lock:
+            entry = self._entries.get(deck_id)
+            return entry[1] if entry else None
+
+    def _lookup(self, deck_id, change_token):
+        with self._lock:
+            entry = self._entries.get(deck_id)
+            if entry is None or entry[0] != change_token:
+                return None
+            self.hits += 1
+            self._entries.move_to_end(deck_id)
+            return entry[1]
+
+    def _evict(self):
+        total = sum(snapshot.footprint() for _, snapshot in self._entries.values())
+        while total > self.max_bytes and len(self._entries) > 1:
+            deck_id, (_, snapshot) = self._entries.popitem(last=False)
+            self._build_locks.pop(deck_id, None)
+            total -= snapshot.footprint()
+            self.evictions += 1
+
+    def trim(self):
+        """Re-check the budget, e.g. after snapshots grew by caching packed payloads."""
+        with self._lock:
+            self._evict()
+
+    def stats(self):
+        with self._lock:
+            sizes = {deck_id: snapshot.footprint() for deck_id, (_, snapshot) in self._entries.items()}
+        return {
+            "decks": len(sizes),
+            "bytes": sum(sizes.values()),
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "hits": self.hits,
+            "misses": self.misses,
+            "by_deck": sizes,
+        }
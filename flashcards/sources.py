@@ -0,0 +1,398 @@
+"""
+Deck sources: where a deck's cards are read from.
+
+    JsonDeckSource       data.json ({"flashcards": [...]} or a raw list)
+    JsonLinesDeckSource  one card per line, random access through JsonlDeckIndex
+    SqliteDeckSource     typed tables with an FTS5 index over the text fields
+
+All sources hand out cards as plain dicts with an "id" (flashcards.deck). The
+JSON sources answer filter/search/page queries from the loaded list; the
+SQLite source runs them as indexed queries and never loads the whole deck for
+them. Use open_deck_source() to pick a source by file extension.
+
+    python -m flashcards.sources import data.json data.sqlite
+"""
+
+import argparse
+import json
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from flashcards.deck import JsonlDeckIndex, assign_card_ids, read_deck_file, write_jsonl
+
+
+def _text_fields(card):
+    english = card.get("english")
+    if isinstance(english, list):
+        english = " / ".join(english)
+    return [card.get("chinese") or "", english or "", card.get("question") or "", card.get("answer") or ""]
+
+
+class DeckSource:
+    """
+    Base class. Subclasses implement cards() and change_token(); the query
+    methods below work on the full card list and may be overridden.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.deck_id = os.path.splitext(os.path.basename(path))[0]
+
+    def cards(self):
+        raise NotImplementedError
+
+    def change_token(self):
+        """Changes whenever the cards may have changed; used as a cache key."""
+        return os.path.getmtime(self.path)
+
+    def get(self, card_id):
+        for card in self.cards():
+            if card["id"] == card_id:
+                return card
+        return None
+
+    def filter(self, card_type=None, category=None):
+        return [
+            card for card in self.cards()
+            if (card_type is None or card.get("type") == card_type)
+            and (category is None or card.get("category") == category)
+        ]
+
+    def page(self, card_type=None, offset=0, limit=50):
+        return self.filter(card_type)[offset:offset + limit]
+
+    def count(self, card_type=None):
+        return len(self.filter(card_type))
+
+    def search(self, query, card_type=None, limit=50):
+        """Cards whose text fields contain `query` (case-insensitive)."""
+        needle = query.strip().lower()
+        if not needle:
+            return []
+        hits = []
+        for card in self.filter(card_type):
+            if any(needle in field.lower() for field in _text_fields(card)):
+                hits.append(card)
+                if len(hits) >= limit:
+                    break
+        return hits
+
+
+class JsonDeckSource(DeckSource):
+    """
+    Reads the file on every call; built decks are cached (and bounded) by
+    flashcards.registry, not by the source.
+    """
+
+    def cards(self):
+        return assign_card_ids(read_deck_file(self.path))
+
+
+class JsonLinesDeckSource(JsonDeckSource):
+    """JSON lines deck; get() reads a single line through the offset index."""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self._index = None
+        self._index_token = None
+
+    def get(self, card_id):
+        token = self.change_token()
+        if self._index is None or token != self._index_token:
+            if self._index is not None:
+                self._index.close()
+            self._index = JsonlDeckIndex(self.path)
+            self._index_token = token
+        return self._index.get(card_id)
+
+
+# --- SQLite -------------------------------------------------------------------
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cards (
+    id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    category TEXT,
+    chinese TEXT,
+    english TEXT,
+    question TEXT,
+    answer TEXT,
+    verb_group TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS cards_type_position ON cards (type, position);
+CREATE INDEX IF NOT EXISTS cards_type_category ON cards (type, category, position);
+-- List fields, one row per item:
+--   english         vocabulary alternatives (term)
+--   phrasal_verb    term = english, gloss = chinese for phrasal_verbs cards
+--   connective      IELTS logicalConnectives
+--   advanced_vocab  term = word, gloss = translation
+CREATE TABLE IF NOT EXISTS card_terms (
+    card_id TEXT NOT NULL REFERENCES cards (id) ON DELETE CASCADE,
+    kind TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    term TEXT NOT NULL,
+    gloss TEXT,
+    is_object INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (card_id, kind, position)
+);
+CREATE INDEX IF NOT EXISTS card_terms_term ON card_terms (term COLLATE NOCASE);
+CREATE VIRTUAL TABLE IF NOT EXISTS cards_fts USING fts5 (
+    card_id UNINDEXED, chinese, english, question, answer, tokenize = 'trigram'
+);
+"""
+
+_TYPED_KEYS = {"id", "type", "category", "chinese", "english", "question", "answer", "verbGroup",
+               "phrasalVerbs", "logicalConnectives", "advancedVocab"}
+_TERM_FIELDS = {
+    "phrasalVerbs": ("phrasal_verb", "english", "chinese"),
+    "logicalConnectives": ("connective", None, None),
+    "advancedVocab": ("advanced_vocab", "word", "translation"),
+}
+_FIELD_BY_KIND = {kind: field for field, (kind, _, _) in _TERM_FIELDS.items()}
+
+# FTS5's trigram tokenizer cannot match fewer than three characters, and
+# two-character Chinese words are common, so short queries fall back to LIKE.
+MIN_FTS_QUERY = 3
+
+
+class SqlitePool:
+    """
+    A small pool of connections to one database file, shared by every
+    Streamlit session in the process (see SqlitePool.for_path).
+    """
+
+    _pools = {}
+    _pools_lock = threading.Lock()
+
+    def __init__(self, path, size=4):
+        self.path = path
+        self._idle = queue.LifoQueue()
+        self._size = size
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_path(cls, path, size=4):
+        key = os.path.abspath(path)
+        with cls._pools_lock:
+            if key not in cls._pools:
+                cls._pools[key] = cls(key, size)
+            return cls._pools[key]
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_create = self._created < self._size
+                if can_create:
+                    self._created += 1
+            conn = self._connect() if can_create else self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+
+class SqliteDeckSource(DeckSource):
+
+    def __init__(self, path, pool=None):
+        super().__init__(path)
+        self.pool = pool or SqlitePool.for_path(path)
+        with self.pool.connection() as conn:
+            conn.executescript(SCHEMA)
+
+    # Writing
+
+    def import_cards(self, cards):
+        """Replace the deck with `cards` (ids are assigned if missing)."""
+        cards = assign_card_ids(cards)
+        with self.pool.connection() as conn, conn:
+            conn.execute("DELETE FROM cards")
+            conn.execute("DELETE FROM cards_fts")
+            for position, card in enumerate(cards):
+                english = card.get("english")
+                extra = {k: v for k, v in card.items() if k not in _TYPED_KEYS}
+                conn.execute(
+                    "INSERT INTO cards VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (card["id"], position, card.get("type", ""), card.get("category"), card.get("chinese"),
+                     english if not isinstance(english, list) else None, card.get("question"),
+                     card.get("answer"), card.get("verbGroup"),
+                     json.dumps(extra, ensure_ascii=False) if extra else None),
+                )
+                terms = [("english", i, term, None, 0) for i, term in enumerate(english)] \
+                    if isinstance(english, list) else []
+                for field, (kind, term_key, gloss_key) in _TERM_FIELDS.items():
+                    for i, item in enumerate(card.get(field) or []):
+                        if isinstance(item, dict):
+                            terms.append((kind, i, item.get(term_key, ""), item.get(gloss_key), 1))
+                        else:
+                            terms.append((kind, i, item, None, 0))
+                conn.executemany(
+                    "INSERT INTO card_terms VALUES (?, ?, ?, ?, ?, ?)",
+                    [(card["id"],) + term for term in terms],
+                )
+                conn.execute("INSERT INTO cards_fts VALUES (?, ?, ?, ?, ?)", [card["id"]] + _text_fields(card))
+            conn.execute(
+                "INSERT INTO meta VALUES ('revision', '1') "
+                "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+            )
+        return len(cards)
+
+    # Reading
+
+    def change_token(self):
+        with self.pool.connection() as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'revision'").fetchone()
+        return int(row["value"]) if row else 0
+
+    def _hydrate(self, conn, rows):
+        """Turn cards rows (plus their card_terms) back into card dicts, in row order."""
+        rows = list(rows)
+        if not rows:
+            return []
+        cards = {}
+        for row in rows:
+            card = {"id": row["id"], "type": row["type"]}
+            for column, key in (("category", "category"), ("chinese", "chinese"), ("english", "english"),
+                                ("question", "question"), ("answer", "answer"), ("verb_group", "verbGroup")):
+                if row[column] is not None:
+                    card[key] = row[column]
+            if row["extra"]:
+                card.update(json.loads(row["extra"]))
+            cards[row["id"]] = card
+        ids = list(cards)
+        # Chunked to stay under SQLite's bound-parameter limit.
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            term_rows = conn.execute(
+                "SELECT card_id, kind, term, gloss, is_object FROM card_terms "
+                "WHERE card_id IN ({}) ORDER BY card_id, kind, position".format(",".join("?" * len(chunk))),
+                chunk,
+            )
+            for t in term_rows:
+                card = cards[t["card_id"]]
+                if t["kind"] == "english":
+                    card.setdefault("english", []).append(t["term"])
+                    continue
+                field = _FIELD_BY_KIND[t["kind"]]
+                _, term_key, gloss_key = _TERM_FIELDS[field]
+                item = {term_key: t["term"], gloss_key: t["gloss"]} if t["is_object"] else t["term"]
+                card.setdefault(field, []).append(item)
+        # IELTS cards always carry their three lists, even when empty.
+        for card in cards.values():
+            if card["type"] == "ielts_questions":
+                for field in _TERM_FIELDS:
+                    card.setdefault(field, [])
+        return [cards[card_id] for card_id in ids]
+
+    def _query(self, sql, params=()):
+        with self.pool.connection() as conn:
+            return self._hydrate(conn, conn.execute(sql, params))
+
+    def cards(self):
+        return self._query("SELECT * FROM cards ORDER BY position")
+
+    def get(self, card_id):
+        found = self._query("SELECT * FROM cards WHERE id = ?", (card_id,))
+        return found[0] if found else None
+
+    def filter(self, card_type=None, category=None):
+        where, params = self._where(card_type, category)
+        return self._query("SELECT * FROM cards{} ORDER BY position".format(where), params)
+
+    def page(self, card_type=None, offset=0, limit=50):
+        where, params = self._where(card_type)
+        return self._query(
+            "SELECT * FROM cards{} ORDER BY position LIMIT ? OFFSET ?".format(where), params + [limit, offset])
+
+    def count(self, card_type=None):
+        where, params = self._where(card_type)
+        with self.pool.connection() as conn:
+            return conn.execute("SELECT COUNT(*) FROM cards" + where, params).fetchone()[0]
+
+    def search(self, query, card_type=None, limit=50):
+        query = query.strip()
+        if not query:
+            return []
+        type_clause = " AND c.type = ?" if card_type else ""
+        type_params = [card_type] if card_type else []
+        if len(query) >= MIN_FTS_QUERY:
+            sql = ("SELECT c.* FROM cards_fts f JOIN cards c ON c.id = f.card_id "
+                   "WHERE cards_fts MATCH ?{} ORDER BY f.rank LIMIT ?".format(type_clause))
+            params = ['"{}"'.format(query.replace('"', '""'))] + type_params + [limit]
+        else:
+            pattern = "%" + query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            like = " OR ".join("f.{} LIKE ? ESCAPE '\\'".format(col) for col in ("chinese", "english", "question", "answer"))
+            sql = ("SELECT c.* FROM cards_fts f JOIN cards c ON c.id = f.card_id "
+                   "WHERE ({}){} ORDER BY c.position LIMIT ?".format(like, type_clause))
+            params = [pattern] * 4 + type_params + [limit]
+        return self._query(sql, params)
+
+    @staticmethod
+    def _where(card_type=None, category=None):
+        clauses, params = [], []
+        if card_type is not None:
+            clauses.append("type = ?")
+            params.append(card_type)
+        if category is not None:
+            clauses.append("category = ?")
+            params.append(category)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+SOURCES = {
+    ".json": JsonDeckSource,
+    ".jsonl": JsonLinesDeckSource,
+    ".sqlite": SqliteDeckSource,
+    ".db": SqliteDeckSource,
+}
+
+
+def open_deck_source(path):
+    """Pick a DeckSource for `path` by its extension."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in SOURCES:
+        raise ValueError("Unsupported deck file: {}".format(path))
+    return SOURCES[ext](path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a deck between JSON, JSON lines and SQLite.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    convert = sub.add_parser("import", help="copy every card from SOURCE into DEST")
+    convert.add_argument("source")
+    convert.add_argument("dest", help=".json, .jsonl or .sqlite/.db")
+    args = parser.parse_args(argv)
+
+    cards = open_deck_source(args.source).cards()
+    ext = os.path.splitext(args.dest)[1].lower()
+    if ext == ".jsonl":
+        write_jsonl(cards, args.dest)
+    elif ext == ".json":
+        with open(args.dest, "w", encoding="utf-8") as f:
+            json.dump({"flashcards": cards}, f, ensure_ascii=False, indent=2)
+    else:
+        open_deck_source(args.dest).import_cards(cards)
+    print("wrote {} cards to {}".format(len(cards), args.dest))
+
+
+if __name__ == "__main__":
+    main()
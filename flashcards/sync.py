@@ -0,0 +1,209 @@
+"""
+Deck versions and deltas between them.
+
+Every distinct build of a deck gets a version number. For each version the
+history keeps only {card_id: revision} on disk, which is enough to tell a
+returning browser which cards were added, removed or modified since the
+version it has cached. Card contents always come from the current build.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+from flashcards.cards import card_json
+from flashcards.payload import bytes_by_type, pack_payload
+from flashcards.registry import deep_sizeof
+
+REVISION_LENGTH = 12
+KEEP_VERSIONS = 30
+
+
+def card_revision(card):
+    """Content hash of a built card; changes whenever anything the page sees changes."""
+    encoded = json.dumps(card_json(card), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()[:REVISION_LENGTH]
+
+
+def deck_hash(revisions):
+    digest = hashlib.sha1()
+    for card_id in sorted(revisions):
+        digest.update("{}:{}\n".format(card_id, revisions[card_id]).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def diff_revisions(old, new):
+    """Card ids added, removed and modified going from `old` to `new` ({id: revision})."""
+    return {
+        "added": [card_id for card_id in new if card_id not in old],
+        "removed": [card_id for card_id in old if card_id not in new],
+        "modified": [card_id for card_id in new if card_id in old and old[card_id] != new[card_id]],
+    }
+
+
+class DeckHistory:
+    """
+    On-disk list of versions for one deck:
+
+      <directory>/versions.json    [{"version": 1, "hash": "..."}, ...]
+      <directory>/v<N>.json        {card_id: revision} for version N
+
+    Only the newest KEEP_VERSIONS are kept; older clients get a full deck.
+    """
+
+    def __init__(self, directory, keep=KEEP_VERSIONS):
+        self.directory = directory
+        self.keep = keep
+        self._lock = threading.Lock()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _read(self, name, default):
+        try:
+            with open(self._path(name), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return default
+
+    def _write(self, name, data):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = self._path(name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, separators=(",", ":"))
+        os.replace(tmp, self._path(name))
+
+    def versions(self):
+        return self._read("versions.json", [])
+
+    def hash_of(self, version):
+        for entry in self.versions():
+            if entry["version"] == version:
+                return entry["hash"]
+        return None
+
+    def revisions(self, version):
+        """{card_id: revision} for `version`, or None if it is not kept."""
+        return self._read("v{}.json".format(version), None)
+
+    def record(self, revisions):
+        """
+        Register a build and return its version number. Rebuilding an
+        unchanged deck returns the existing version.
+        """
+        current_hash = deck_hash(revisions)
+        with self._lock:
+            versions = self.versions()
+            if versions and versions[-1]["hash"] == current_hash:
+                return versions[-1]["version"]
+            version = versions[-1]["version"] + 1 if versions else 1
+            self._write("v{}.json".format(version), revisions)
+            versions.append({"version": version, "hash": current_hash})
+            for old in versions[:-self.keep]:
+                try:
+                    os.remove(self._path("v{}.json".format(old["version"])))
+                except OSError:
+                    pass
+            self._write("versions.json", versions[-self.keep:])
+            return version
+
+
+class DeckSnapshot:
+    """One version of a built deck, with what is needed to sync a client to it."""
+
+    def __init__(self, deck_id, cards, history, source_cards=None, previous=None):
+        """
+        `source_cards` are the raw cards `cards` were built from; keeping
+        their revisions lets the next build reuse unchanged cards (see
+        reusable()). Revisions of cards carried over from `previous` are
+        not hashed again.
+        """
+        self.deck_id = deck_id
+        self.cards = cards
+        self.by_id = {card["id"]: card for card in cards}
+        self.source_revisions = {card["id"]: card_revision(card) for card in source_cards or ()}
+        old_revisions = previous.revisions if previous else {}
+        old_cards = previous.by_id if previous else {}
+        self.revisions = {
+            card["id"]: old_revisions[card["id"]] if old_cards.get(card["id"]) is card else card_revision(card)
+            for card in cards
+        }
+        self.hash = deck_hash(self.revisions)
+        self.history = history
+        self.version = history.record(self.revisions)
+        self._packed = {}
+        self._card_bytes = {}
+        self._base_footprint = None
+
+    def reusable(self, source_card):
+        """The built card for `source_card` if it is unchanged since this snapshot, else None."""
+        card_id = source_card.get("id")
+        if self.source_revisions.get(card_id) == card_revision(source_card):
+            return self.by_id.get(card_id)
+        return None
+
+    def footprint(self):
+        """Approximate bytes held, for the deck registry's memory budget."""
+        if self._base_footprint is None:
+            self._base_footprint = deep_sizeof([self.cards, self.by_id, self.revisions, self.source_revisions])
+        # Uncompressed payloads reuse the card dicts already counted above.
+        return self._base_footprint + sum(len(blob) for _, blob in self._packed.values() if blob)
+
+    def manifest(self):
+        return {"id": self.deck_id, "version": self.version, "hash": self.hash, "size": len(self.cards)}
+
+    def full_payload(self):
+        return {"kind": "full", "to": self.version, "cards": self.cards}
+
+    def delta_payload(self, from_version):
+        """Cards changed since `from_version`, or None if that version is no longer kept."""
+        old = self.history.revisions(from_version)
+        if old is None:
+            return None
+        changes = diff_revisions(old, self.revisions)
+        return {
+            "kind": "delta",
+            "from": from_version,
+            "to": self.version,
+            "added": [self.by_id[card_id] for card_id in changes["added"]],
+            "modified": [self.by_id[card_id] for card_id in changes["modified"]],
+            "removed": changes["removed"],
+        }
+
+    def sync_payload(self, have_version, have_hash=None):
+        """
+        What to send a client that reports holding `have_version` with
+        `have_hash` (None if it has nothing cached): None when it is current,
+        else a delta or the full deck. A hash that does not match our record
+        of that version (e.g. the history was reset) gets the full deck.
+        """
+        if have_hash == self.hash:
+            return None
+        if have_version is not None and self.history.hash_of(have_version) == have_hash:
+            delta = self.delta_payload(have_version)
+            if delta is not None:
+                return delta
+        return self.full_payload()
+
+    def packed_sync_payload(self, have_version, have_hash=None, encodings=()):
+        """
+        sync_payload() split into (header, blob) for the page, see
+        flashcards.payload.pack_payload. Compressed results are memoised since
+        every session starting from the same version needs the same bytes.
+        """
+        key = (have_version, have_hash, tuple(encodings or ()))
+        if key not in self._packed:
+            if len(self._packed) >= 16:
+                self._packed.clear()
+            self._packed[key] = pack_payload(self.sync_payload(have_version, have_hash), encodings)
+        return self._packed[key]
+
+    def card_bytes(self, have_version, have_hash=None):
+        """{card type: JSON bytes} of the cards sync_payload() sends, for metrics; memoised the same way."""
+        key = (have_version, have_hash)
+        if key not in self._card_bytes:
+            if len(self._card_bytes) >= 16:
+                self._card_bytes.clear()
+            self._card_bytes[key] = bytes_by_type(self.sync_payload(have_version, have_hash))
+        return self._card_bytes[key]
@@ -0,0 +1,104 @@
+"""
+Per-card response times reported by the page.
+
+The page records, for every card it shows, how long the learner took to
+reveal the English (Space, the Show/Hide button or a click on an IELTS
+question) and how long the card stayed on screen. Records are kept in a
+ring buffer in the page and sent in batches as a "timings" component
+message, so a session costs one message per batch, not one per keypress.
+Each batch is appended here to a JSON-lines log, one record per line:
+
+  {"user": "eiki", "deck": "data", "client": "...", "card": "<id>", "type": "sentence",
+   "mode": "flashcards", "shown": 1760000000000, "reveal": 2140, "dwell": 5310, "via": "key"}
+
+`shown` is the page's clock in ms since the epoch, `reveal` and `dwell` are
+ms (`reveal` is null if the card was never revealed), and `via` is how it
+was revealed. `dropped` lines count records the ring buffer overwrote
+before they could be sent.
+
+    python -m flashcards.timings .timings/data.jsonl
+"""
+
+import argparse
+import json
+import os
+import threading
+from statistics import median
+
+FIELDS = ("card", "type", "mode", "shown", "reveal", "dwell", "via")
+
+
+class TimingLog:
+    """An append-only JSON-lines file of timing records, shared by all sessions."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, records, dropped=0, **context):
+        """Write one batch; `context` (user, deck, client) is added to every record."""
+        lines = []
+        for record in records:
+            if not isinstance(record, dict) or not record.get("card"):
+                continue
+            entry = dict(context)
+            entry.update((key, record.get(key)) for key in FIELDS)
+            lines.append(json.dumps(entry, ensure_ascii=False, separators=(",", ":")))
+        if dropped:
+            lines.append(json.dumps(dict(context, dropped=dropped), separators=(",", ":")))
+        if not lines:
+            return 0
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        return len(lines)
+
+    def records(self):
+        """Every card record in the log, oldest first; unreadable lines are skipped."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if "card" in record:
+                        yield record
+        except OSError:
+            return
+
+
+def summarize(records):
+    """{type: {"cards": n, "reveal": median ms, "dwell": median ms}} over `records`."""
+    by_type = {}
+    for record in records:
+        by_type.setdefault(record.get("type"), []).append(record)
+    summary = {}
+    for card_type, group in by_type.items():
+        reveals = [r["reveal"] for r in group if isinstance(r.get("reveal"), (int, float))]
+        dwells = [r["dwell"] for r in group if isinstance(r.get("dwell"), (int, float))]
+        summary[card_type] = {
+            "cards": len(group),
+            "reveal": median(reveals) if reveals else None,
+            "dwell": median(dwells) if dwells else None,
+        }
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize a per-card timing log.")
+    parser.add_argument("log", help="JSON-lines timing log")
+    parser.add_argument("--user", help="only this user's records")
+    args = parser.parse_args(argv)
+    records = [r for r in TimingLog(args.log).records() if not args.user or r.get("user") == args.user]
+    print("{:<16} {:>6} {:>11} {:>10}".format("type", "cards", "reveal ms", "dwell ms"))
+    for card_type, stats in sorted(summarize(records).items(), key=lambda item: str(item[0])):
+        print("{:<16} {:>6} {:>11} {:>10}".format(
+            str(card_type), stats["cards"],
+            "-" if stats["reveal"] is None else round(stats["reveal"]),
+            "-" if stats["dwell"] is None else round(stats["dwell"])))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Background watcher that rebuilds decks when their files change.
+
+One daemon thread per process polls the change token (mtime, or the SQLite
+revision) of every deck a session has opened. On a change it rebuilds the
+deck through the registry right away, so the next session tick finds the
+new version ready. The rebuild only recompiles cards whose source changed
+(DeckSnapshot.reusable). Pages then receive the new version as a delta on
+their next tick.
+
+Polling keeps this dependency-free and works the same for JSON, JSON lines
+and SQLite decks.
+"""
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 2.0
+
+
+class DeckWatcher:
+
+    def __init__(self, registry, interval=DEFAULT_INTERVAL):
+        self.registry = registry
+        self.interval = interval
+        self._watched = {}  # deck_id -> (source, build)
+        self._tokens = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.reloads = 0
+
+    def watch(self, deck_id, source, build):
+        """
+        Start watching `source` for `deck_id`. `build()` must return a
+        snapshot for the source's current contents.
+        """
+        with self._lock:
+            if deck_id in self._watched and self._watched[deck_id][0] is source:
+                return
+            self._watched[deck_id] = (source, build)
+            self._tokens[deck_id] = source.change_token()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="deck-watcher", daemon=True)
+                self._thread.start()
+
+    def unwatch(self, deck_id):
+        with self._lock:
+            self._watched.pop(deck_id, None)
+            self._tokens.pop(deck_id, None)
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+    def poll(self):
+        """Check every watched deck once; returns the ids that were rebuilt."""
+        with self._lock:
+            watched = list(self._watched.items())
+        rebuilt = []
+        for deck_id, (source, build) in watched:
+            if self.registry.peek(deck_id) is None:
+                # Evicted from the registry: nobody has asked for it lately.
+                self.unwatch(deck_id)
+                continue
+            try:
+                token = source.change_token()
+                if token == self._tokens.get(deck_id):
+                    continue
+                self.registry.get(deck_id, token, build)
+            except Exception:
+                # A half-written file fails to parse; try again next poll.
+                logger.exception("Reloading deck %s failed", deck_id)
+                continue
+            with self._lock:
+                if deck_id in self._watched:
+                    self._tokens[deck_id] = token
+            self.reloads += 1
+            rebuilt.append(deck_id)
+        return rebuilt
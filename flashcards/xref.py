@@ -0,0 +1,184 @@
+"""
+Cross-references from vocabulary and phrasal verb cards to the IELTS answers
+that use their terms.
+
+TermIndex is an inverted index from each term, in lower case, to the ids of
+the IELTS cards that use it. An IELTS card uses a term when the term is in
+its phrasalVerbs or advancedVocab list, or when the answer contains it in
+any inflected form:
+
+  - a phrasal verb with any form of its verb ("put off", "putting off",
+    "put it off": up to PARTICLE_GAP words may sit between a two-word
+    phrasal verb's verb and particle);
+  - a vocabulary term with its first or last word inflected ("hidden gems",
+    "broadened my horizons"). Forms come from verb_forms(), so regular
+    plurals are covered by its third-person form.
+
+Each answer is scanned once, with a few dict lookups per word, so the
+index is built in time linear in the deck's text. It is built once per deck
+version, and attach_usages() stores each card's slice of it as `usedIn`:
+
+  usedIn: {"put off": ["<ielts id>", ...]}
+
+The page then jumps from a card to an answer through its card-id map.
+
+    python -m flashcards.xref data.json "put off"
+"""
+
+import argparse
+import re
+
+from flashcards.cards import with_field
+from flashcards.lexicon import VERB_INFLECTIONS, verb_forms
+
+SOURCE_TYPES = ("vocabulary", "phrasal_verbs")
+PARTICLE_GAP = 3
+
+_WORD_RE = re.compile(r"[a-z0-9]+(?:['-][a-z0-9]+)*")
+
+
+def _words(text):
+    return tuple(_WORD_RE.findall((text or "").lower()))
+
+
+def card_terms(card):
+    """The terms a vocabulary or phrasal verb card teaches, lower-cased, in card order."""
+    if card.get("type") == "phrasal_verbs":
+        terms = [pv.get("english") if isinstance(pv, dict) else pv for pv in card.get("phrasalVerbs") or ()]
+    elif card.get("type") == "vocabulary":
+        english = card.get("english") or ()
+        terms = english if isinstance(english, (list, tuple)) else [english]
+    else:
+        return []
+    return list(dict.fromkeys(" ".join(_words(term)) for term in terms if _words(term)))
+
+
+def _listed_terms(card):
+    """Terms an IELTS card lists in phrasalVerbs and advancedVocab."""
+    terms = list(card.get("phrasalVerbs") or ())
+    for vocab in card.get("advancedVocab") or ():
+        terms.append(vocab.get("word") if isinstance(vocab, dict) else vocab)
+    return [" ".join(_words(term)) for term in terms if _words(term)]
+
+
+class TermIndex:
+    """Term -> ids of the IELTS cards that use it, built over a whole deck."""
+
+    def __init__(self, cards, inflections):
+        self.cards = {}
+        phrasal = set()
+        terms = set()
+        for card in cards:
+            if card.get("type") in SOURCE_TYPES:
+                found = card_terms(card)
+                terms.update(found)
+                if card.get("type") == "phrasal_verbs":
+                    phrasal.update(found)
+        self._build_forms(terms, phrasal, inflections)
+        for card in cards:
+            if card.get("type") == "ielts_questions":
+                used = set(_listed_terms(card)) | self._scan(_words(card.get("answer")))
+                for term in used:
+                    self.cards.setdefault(term, []).append(card["id"])
+
+    def _build_forms(self, terms, phrasal, inflections):
+        # One-word surface forms -> their terms; longer ones are found by their
+        # first two words -> [(the words after those, term)].
+        self.singles = {}
+        self.starts = {}
+        # Verb form -> {particle: phrasal verb} for two-word phrasal verbs.
+        self.separable = {}
+        cache = {}
+
+        def forms_of(word):
+            if word not in cache:
+                cache[word] = verb_forms(word, inflections)
+            return cache[word]
+
+        for term in terms:
+            words = term.split()
+            variants = {tuple(words)}
+            variants.update((form,) + tuple(words[1:]) for form in forms_of(words[0]))
+            if term in phrasal:
+                if len(words) == 2:
+                    for form in forms_of(words[0]):
+                        self.separable.setdefault(form, {})[words[1]] = term
+            else:
+                variants.update(tuple(words[:-1]) + (form,) for form in forms_of(words[-1]))
+            for variant in variants:
+                if len(variant) == 1:
+                    self.singles.setdefault(variant[0], set()).add(term)
+                else:
+                    self.starts.setdefault(variant[:2], []).append((variant[2:], term))
+
+    def _scan(self, words):
+        """Terms used anywhere in `words`: a few dict lookups per word, more only where a term may start."""
+        used = set()
+        singles, starts, separable = self.singles, self.starts, self.separable
+        for i, word in enumerate(words):
+            terms = singles.get(word)
+            if terms:
+                used.update(terms)
+            candidates = starts.get(words[i:i + 2])
+            if candidates:
+                for rest, term in candidates:
+                    if not rest or words[i + 2:i + 2 + len(rest)] == rest:
+                        used.add(term)
+            particles = separable.get(word)
+            if particles:
+                for later in words[i + 2:i + 2 + PARTICLE_GAP]:
+                    if later in particles:
+                        used.add(particles[later])
+        return used
+
+    def __contains__(self, term):
+        return " ".join(_words(term)) in self.cards
+
+    def lookup(self, term):
+        """Ids of the IELTS cards using `term` (any case or spacing), in deck order."""
+        return self.cards.get(" ".join(_words(term)), [])
+
+    def used_in(self, card):
+        """{term: IELTS card ids} for the terms of `card` that any answer uses."""
+        return {term: self.cards[term] for term in card_terms(card) if term in self.cards}
+
+
+def attach_usages(cards, lexicons):
+    """
+    Return `cards` with `usedIn` set on every vocabulary and phrasal verb
+    card. Cards whose cross-references did not change are returned as the
+    same objects.
+    """
+    index = TermIndex(cards, lexicons[VERB_INFLECTIONS])
+    linked = []
+    for card in cards:
+        if card.get("type") in SOURCE_TYPES:
+            used = index.used_in(card)
+            # Cards no answer uses are left without the field.
+            if used or "usedIn" in card:
+                card = with_field(card, "usedIn", used)
+        linked.append(card)
+    return linked
+
+
+def main(argv=None):
+    from flashcards.deck import assign_card_ids, read_deck_file
+    from flashcards.lexicon import load_lexicons
+
+    parser = argparse.ArgumentParser(description="Show the IELTS answers that use a term.")
+    parser.add_argument("deck", help="data.json or .jsonl deck")
+    parser.add_argument("terms", nargs="*", help="terms to look up (default: every card term that is used)")
+    args = parser.parse_args(argv)
+    cards = assign_card_ids(read_deck_file(args.deck))
+    index = TermIndex(cards, load_lexicons()[VERB_INFLECTIONS])
+    by_id = {card["id"]: card for card in cards}
+    terms = args.terms or sorted({term for card in cards for term in index.used_in(card)})
+    for term in terms:
+        ids = index.lookup(term)
+        print("{} ({} answers)".format(term, len(ids)))
+        for card_id in ids:
+            print("  {}  {}".format(card_id, (by_id[card_id].get("question") or "")[:70]))
+
+
+if __name__ == "__main__":
+    main()
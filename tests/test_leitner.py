@@ -0,0 +1,46 @@
+import pytest
+
+from flashcards import leitner
+from flashcards.leitner import INTERVALS, LeitnerBoxes
+
+CARDS = [{"id": "c{}".format(i), "type": "sentence"} for i in range(5)]
+
+
+@pytest.fixture
+def day(monkeypatch):
+    current = [1000]
+    monkeypatch.setattr(leitner, "today", lambda: current[0])
+    return current
+
+
+def answer_all(boxes, knew=True, known=None):
+    for card_id, box in boxes.due_cards("sentence", known=known):
+        boxes.answer("sentence", card_id, box, knew)
+
+
+def test_deleted_card_does_not_keep_its_box_due(tmp_path, day):
+    boxes = LeitnerBoxes(str(tmp_path))
+    boxes.sync("v1", CARDS)
+    answer_all(boxes)
+    day[0] += INTERVALS[1]
+
+    boxes = LeitnerBoxes(str(tmp_path))
+    boxes.sync("v2", CARDS[1:])
+    assert boxes.due_count("sentence") == 4
+    answer_all(boxes, known={card["id"] for card in CARDS[1:]})
+
+    assert boxes.due_count("sentence") == 0
+    assert not boxes.is_due("sentence", 1, day[0] + 1)
+    assert boxes.counts()["sentence"] == [0, 0, 4, 0, 0]
+    assert boxes.state["boxes"]["sentence"][1]["taken"] == []
+
+
+def test_deleted_card_that_returns_starts_in_the_first_box(tmp_path, day):
+    boxes = LeitnerBoxes(str(tmp_path))
+    boxes.sync("v1", CARDS)
+    answer_all(boxes)
+    boxes.sync("v2", CARDS[1:])
+    boxes.sync("v3", CARDS)
+    assert boxes.counts()["sentence"] == [1, 4, 0, 0, 0]
+    day[0] += INTERVALS[0]
+    assert LeitnerBoxes(str(tmp_path)).due_cards("sentence") == [("c0", 0)]